@@ -0,0 +1,55 @@
+"""
+Leitura do CSV gerado pelo Signal Analyzer
+==========================================
+Centraliza os tipos das colunas e o motor de leitura usados por
+data_analyzer.py e esp32_to_nilmtk.py.
+"""
+
+import pandas as pd
+from typing import Optional
+
+# Tipos das colunas do CSV (timestamp é tratado via parse_dates).
+# data_type tem poucos valores distintos: como categoria, os filtros
+# comparam códigos inteiros em vez de strings.
+CSV_DTYPES = {
+    'packet_id': 'int32',
+    'data_type': 'category',
+    'time_or_freq': 'float32',
+    'amplitude_or_magnitude': 'float32'
+}
+
+
+def read_signal_csv(csv_file: str, chunksize: Optional[int] = None):
+    """
+    Lê o CSV do Signal Analyzer com tipos explícitos.
+
+    Usa o leitor CSV do PyArrow (vetorizado e multithread) quando
+    disponível, caso contrário o motor C do pandas.
+
+    Parameters:
+    -----------
+    csv_file : str
+        Caminho para o arquivo CSV
+    chunksize : int, optional
+        Se informado, retorna um iterador de blocos com esse número de
+        linhas (leitura em blocos usa sempre o motor C)
+
+    Returns:
+    --------
+    pd.DataFrame
+        DataFrame com timestamp já convertido para datetime (ou iterador
+        de DataFrames quando chunksize é informado)
+    """
+    options = dict(dtype=CSV_DTYPES, parse_dates=['timestamp'])
+    # Motor C lê os bytes diretamente do arquivo mapeado em memória (mmap)
+    c_options = dict(engine='c', memory_map=True, **options)
+
+    if chunksize:
+        # O motor PyArrow não suporta leitura em blocos
+        return pd.read_csv(csv_file, chunksize=chunksize, **c_options)
+
+    try:
+        return pd.read_csv(csv_file, engine='pyarrow', **options)
+    except ImportError:
+        # PyArrow não instalado
+        return pd.read_csv(csv_file, low_memory=False, **c_options)
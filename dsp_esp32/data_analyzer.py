@@ -7,14 +7,131 @@ Carrega dados do CSV e gera gráficos de análise
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
 from datetime import datetime
 import argparse
 import os
+from concurrent.futures import ProcessPoolExecutor
 
-def load_data(csv_file):
+from csv_loader import read_signal_csv
+
+# Séries maiores que LTTB_THRESHOLD são reduzidas a LTTB_POINTS antes de plotar
+LTTB_THRESHOLD = 4000
+LTTB_POINTS = 2000
+
+def lttb_downsample(x, y, n_out=LTTB_POINTS):
+    """Reduz a série a n_out pontos preservando sua forma (Largest-Triangle-Three-Buckets)"""
+    n = len(x)
+    if n_out < 3 or n <= n_out:
+        return x, y
+    
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    
+    # n_out - 2 baldes entre o primeiro e o último ponto (sempre mantidos)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    selected = np.empty(n_out, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+    
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        
+        # Ponto do balde que forma o maior triângulo com o anterior e a média do próximo
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) -
+                      (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + np.argmax(area)
+        selected[i + 1] = a
+    
+    return x[selected], y[selected]
+
+def series_to_plot(data):
+    """Retorna (x, y) da série, reduzida por LTTB se for muito longa"""
+    x = data['time_or_freq'].values
+    y = data['amplitude_or_magnitude'].values
+    if len(x) > LTTB_THRESHOLD:
+        return lttb_downsample(x, y)
+    return x, y
+
+# Chave nos metadados do Parquet com o estado (mtime, tamanho) do CSV de origem
+CACHE_STAT_KEY = b'signal_csv_stat'
+
+def _csv_stat(csv_file):
+    """Identifica a versão do CSV pelo mtime (ns) e tamanho"""
+    st = os.stat(csv_file)
+    return f"{st.st_mtime_ns}:{st.st_size}".encode()
+
+def read_csv_cached(csv_file):
+    """Lê o CSV usando um cache Parquet ao lado do arquivo quando ele corresponde ao CSV atual"""
+    cache_file = csv_file + '.parquet'
+    
+    # Estado do CSV antes da leitura: o signal_analyzer pode anexar linhas
+    # enquanto lemos, e o cache gravado precisa refletir só o que foi lido
+    csv_stat = _csv_stat(csv_file)
+    
+    if os.path.exists(cache_file):
+        try:
+            import pyarrow.parquet as pq
+            metadata = pq.read_schema(cache_file).metadata or {}
+            if metadata.get(CACHE_STAT_KEY) == csv_stat:
+                df = pd.read_parquet(cache_file)
+                print(f"[INFO] Usando cache: {cache_file}")
+                return df
+        except Exception as e:
+            print(f"[AVISO] Cache inválido ignorado ({e})")
+    
+    df = read_signal_csv(csv_file)
+    
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), CACHE_STAT_KEY: csv_stat})
+        pq.write_table(table, cache_file, compression='zstd')
+    except Exception as e:
+        print(f"[AVISO] Não foi possível criar o cache {cache_file}: {e}")
+    
+    return df
+
+def load_data_lazy(csv_file, packet_id=None, data_type=None):
+    """Monta a leitura preguiçosa do CSV via Polars, com filtros aplicados na própria leitura"""
+    import polars as pl
+    
+    lazy_df = pl.scan_csv(csv_file, schema_overrides={
+        'timestamp': pl.Datetime('ns'),
+        'packet_id': pl.Int32,
+        'data_type': pl.Categorical,
+        'time_or_freq': pl.Float32,
+        'amplitude_or_magnitude': pl.Float32
+    })
+    
+    # Filtros empurrados para a leitura: só as linhas necessárias são materializadas
+    if packet_id is not None:
+        packet_ids = [packet_id] if np.isscalar(packet_id) else list(packet_id)
+        lazy_df = lazy_df.filter(pl.col('packet_id').is_in(packet_ids))
+    if data_type is not None:
+        data_types = [data_type] if isinstance(data_type, str) else list(data_type)
+        lazy_df = lazy_df.filter(pl.col('data_type').cast(pl.Utf8).is_in(data_types))
+    
+    return lazy_df
+
+def load_data(csv_file, backend='pandas', packet_id=None, data_type=None):
     """Carrega dados do arquivo CSV"""
     try:
-        df = pd.read_csv(csv_file)
+        if backend == 'polars':
+            try:
+                df = load_data_lazy(csv_file, packet_id, data_type).collect().to_pandas()
+            except ImportError as e:
+                print(f"[AVISO] Backend polars indisponível ({e}), usando pandas")
+                df = read_csv_cached(csv_file)
+        else:
+            df = read_csv_cached(csv_file)
         print(f"[INFO] Arquivo carregado: {csv_file}")
         print(f"[INFO] Total de registros: {len(df)}")
         
@@ -30,59 +147,106 @@ def load_data(csv_file):
         print(f"[ERRO] Não foi possível carregar {csv_file}: {e}")
         return None
 
-def plot_packet_comparison(df, packet_id):
-    """Plota comparação de um pacote específico"""
-    packet_data = df[df['packet_id'] == packet_id]
+def index_by_packet(df):
+    """Indexa os dados por (packet_id, data_type) para buscas rápidas por pacote"""
+    if isinstance(df.index, pd.MultiIndex):
+        return df
+    return df.set_index(['packet_id', 'data_type']).sort_index()
+
+def select_packet_data(df_indexed, packet_id, data_type):
+    """Retorna as amostras de um tipo de dado de um pacote (vazio se ausente)"""
+    try:
+        return df_indexed.loc[[(packet_id, data_type)]]
+    except KeyError:
+        return df_indexed.iloc[:0]
+
+def plot_packet_comparison(df, packet_id, fig=None):
+    """Plota comparação de um pacote específico (em fig, se informada, sem usar o pyplot)"""
+    df_indexed = index_by_packet(df)
     
-    if packet_data.empty:
+    if packet_id not in df_indexed.index.levels[0]:
         print(f"[ERRO] Pacote {packet_id} não encontrado")
         return
     
-    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 10))
+    if fig is None:
+        fig = plt.figure(figsize=(15, 10), constrained_layout=True)
+    (ax1, ax2), (ax3, ax4) = fig.subplots(2, 2)
     fig.suptitle(f'Análise do Pacote #{packet_id}', fontsize=16)
     
     # Sinal Original
-    signal_orig = packet_data[packet_data['data_type'] == 'signal_original']
+    signal_orig = select_packet_data(df_indexed, packet_id, 'signal_original')
     if not signal_orig.empty:
-        ax1.plot(signal_orig['time_or_freq'], signal_orig['amplitude_or_magnitude'], 'b-', linewidth=1)
+        ax1.plot(*series_to_plot(signal_orig), 'b-', linewidth=1, rasterized=True)
         ax1.set_title('Sinal Original')
         ax1.set_xlabel('Tempo (s)')
         ax1.set_ylabel('Amplitude (V)')
         ax1.grid(True)
     
     # Sinal Filtrado
-    signal_filt = packet_data[packet_data['data_type'] == 'signal_filtered']
+    signal_filt = select_packet_data(df_indexed, packet_id, 'signal_filtered')
     if not signal_filt.empty:
-        ax2.plot(signal_filt['time_or_freq'], signal_filt['amplitude_or_magnitude'], 'r-', linewidth=1)
+        ax2.plot(*series_to_plot(signal_filt), 'r-', linewidth=1, rasterized=True)
         ax2.set_title('Sinal Filtrado')
         ax2.set_xlabel('Tempo (s)')
         ax2.set_ylabel('Amplitude (V)')
         ax2.grid(True)
     
     # FFT Original
-    fft_orig = packet_data[packet_data['data_type'] == 'fft_original']
+    fft_orig = select_packet_data(df_indexed, packet_id, 'fft_original')
     if not fft_orig.empty:
-        ax3.semilogx(fft_orig['time_or_freq'], fft_orig['amplitude_or_magnitude'], 'g-', linewidth=1)
+        ax3.semilogx(fft_orig['time_or_freq'], fft_orig['amplitude_or_magnitude'], 'g-', linewidth=1,
+                     rasterized=True)
         ax3.set_title('FFT do Sinal Original')
         ax3.set_xlabel('Frequência (Hz)')
         ax3.set_ylabel('Magnitude (dB)')
         ax3.grid(True)
     
     # FFT Filtrado
-    fft_filt = packet_data[packet_data['data_type'] == 'fft_filtered']
+    fft_filt = select_packet_data(df_indexed, packet_id, 'fft_filtered')
     if not fft_filt.empty:
-        ax4.semilogx(fft_filt['time_or_freq'], fft_filt['amplitude_or_magnitude'], 'm-', linewidth=1)
+        ax4.semilogx(fft_filt['time_or_freq'], fft_filt['amplitude_or_magnitude'], 'm-', linewidth=1,
+                     rasterized=True)
         ax4.set_title('FFT do Sinal Filtrado')
         ax4.set_xlabel('Frequência (Hz)')
         ax4.set_ylabel('Magnitude (dB)')
         ax4.grid(True)
     
-    plt.tight_layout()
     return fig
 
+def export_packet_figure(packet_data, packet_id, filename):
+    """Gera e salva a figura de um pacote fora do pyplot (executada nos processos de exportação)"""
+    fig = Figure(figsize=(15, 10), constrained_layout=True)
+    plot_packet_comparison(packet_data, packet_id, fig)
+    fig.savefig(filename, dpi=300)
+    return filename
+
+def export_packet_figures(df_indexed, packet_ids, timestamp, max_workers=None):
+    """Exporta um PNG por pacote, renderizando as figuras em paralelo"""
+    available = df_indexed.index.levels[0]
+    jobs = []
+    for packet_id in packet_ids:
+        if packet_id not in available:
+            print(f"[ERRO] Pacote {packet_id} não encontrado")
+            continue
+        # Cada processo recebe só as linhas do seu pacote
+        jobs.append((df_indexed.loc[[packet_id]], packet_id,
+                     f"packet_{packet_id}_analysis_{timestamp}.png"))
+    
+    if not jobs:
+        return []
+    
+    # O Agg renderiza com o GIL preso: processos (e não threads) dão paralelismo real
+    with ProcessPoolExecutor(max_workers=max_workers or min(len(jobs), os.cpu_count() or 1)) as executor:
+        filenames = list(executor.map(export_packet_figure, *zip(*jobs)))
+    
+    for filename in filenames:
+        print(f"[INFO] Gráfico salvo: {filename}")
+    return filenames
+
 def plot_signal_evolution(df, data_type='signal_original', max_packets=10):
     """Plota evolução temporal de múltiplos pacotes"""
-    unique_packets = sorted(df['packet_id'].unique())
+    df_indexed = index_by_packet(df)
+    unique_packets = list(df_indexed.index.levels[0])
     
     if len(unique_packets) > max_packets:
         packets_to_plot = unique_packets[-max_packets:]  # Últimos N pacotes
@@ -90,21 +254,35 @@ def plot_signal_evolution(df, data_type='signal_original', max_packets=10):
     else:
         packets_to_plot = unique_packets
     
-    plt.figure(figsize=(12, 8))
+    plt.figure(figsize=(12, 8), constrained_layout=True)
     
     colors = plt.cm.viridis(np.linspace(0, 1, len(packets_to_plot)))
     
+    segments = []
+    segment_colors = []
+    legend_handles = []
+    
     for i, packet_id in enumerate(packets_to_plot):
-        packet_data = df[(df['packet_id'] == packet_id) & (df['data_type'] == data_type)]
+        packet_data = select_packet_data(df_indexed, packet_id, data_type)
         
         if not packet_data.empty:
-            label = f'Pacote #{packet_id}'
+            # FFT em escala log não é reduzida (LTTB assume eixo x linear)
             if data_type.startswith('fft'):
-                plt.semilogx(packet_data['time_or_freq'], packet_data['amplitude_or_magnitude'], 
-                           color=colors[i], alpha=0.7, linewidth=1, label=label)
+                x, y = packet_data['time_or_freq'].values, packet_data['amplitude_or_magnitude'].values
             else:
-                plt.plot(packet_data['time_or_freq'], packet_data['amplitude_or_magnitude'], 
-                        color=colors[i], alpha=0.7, linewidth=1, label=label)
+                x, y = series_to_plot(packet_data)
+            segments.append(np.column_stack([x, y]))
+            segment_colors.append(colors[i])
+            legend_handles.append(Line2D([], [], color=colors[i], alpha=0.7, linewidth=1,
+                                         label=f'Pacote #{packet_id}'))
+    
+    # Todos os pacotes desenhados por um único artista
+    ax = plt.gca()
+    ax.add_collection(LineCollection(segments, colors=segment_colors, linewidths=1, alpha=0.7,
+                                     rasterized=True))
+    if data_type.startswith('fft'):
+        ax.set_xscale('log')
+    ax.autoscale()
     
     plt.title(f'Evolução Temporal - {data_type.replace("_", " ").title()}')
     
@@ -116,33 +294,69 @@ def plot_signal_evolution(df, data_type='signal_original', max_packets=10):
         plt.ylabel('Magnitude (dB)')
     
     plt.grid(True)
-    plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
-    plt.tight_layout()
+    plt.legend(handles=legend_handles, bbox_to_anchor=(1.05, 1), loc='upper left')
     return plt.gcf()
 
 def generate_statistics(df):
     """Gera estatísticas detalhadas dos dados"""
+    types = df['data_type'].astype('category')
+    codes = types.cat.codes.to_numpy()
+    values = df['amplitude_or_magnitude'].to_numpy(dtype=np.float64)
+    packets = df['packet_id'].to_numpy(dtype=np.int64)
+    
+    # Descarta só as linhas sem tipo: count e packets consideram todas as
+    # linhas do tipo (como len(type_data) e nunique()), inclusive valores NaN
+    has_type = codes >= 0
+    if not has_type.all():
+        codes, values, packets = codes[has_type], values[has_type], packets[has_type]
+    if codes.size == 0:
+        return {}
+    
+    # Ordena por tipo (estável) e reduz cada bloco contíguo direto nos arrays NumPy
+    order = np.argsort(codes, kind='stable')
+    codes, values, packets = codes[order], values[order], packets[order]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    counts = np.diff(np.r_[starts, codes.size])
+    
+    # mean/std/min/max ignoram NaN, como Series.mean/std/min/max
+    missing = np.isnan(values)
+    n_values = counts - np.add.reduceat(missing.astype(np.int64), starts)
+    filled = np.where(missing, 0.0, values) if missing.any() else values
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = np.add.reduceat(filled, starts) / n_values
+        deviations = np.where(missing, 0.0, values - np.repeat(means, counts))
+        stds = np.sqrt(np.add.reduceat(deviations * deviations, starts) / (n_values - 1))
+    stds[n_values < 2] = np.nan
+    mins = np.fmin.reduceat(values, starts)
+    maxs = np.fmax.reduceat(values, starts)
+    
+    # Pacotes distintos por tipo: pares (tipo, pacote) únicos
+    packet_min = packets.min()
+    span = packets.max() - packet_min + 1
+    pairs = np.unique(codes.astype(np.int64) * span + (packets - packet_min))
+    n_packets = np.bincount(pairs // span, minlength=len(types.cat.categories))
+    
+    # Tipos na ordem em que aparecem no arquivo
     stats = {}
-    
-    for data_type in df['data_type'].unique():
-        type_data = df[df['data_type'] == data_type]
-        
-        stats[data_type] = {
-            'count': len(type_data),
-            'mean': type_data['amplitude_or_magnitude'].mean(),
-            'std': type_data['amplitude_or_magnitude'].std(),
-            'min': type_data['amplitude_or_magnitude'].min(),
-            'max': type_data['amplitude_or_magnitude'].max(),
-            'packets': type_data['packet_id'].nunique()
+    for g in np.argsort(order[starts], kind='stable'):
+        code = codes[starts[g]]
+        stats[types.cat.categories[code]] = {
+            'count': int(counts[g]),
+            'mean': float(means[g]),
+            'std': float(stds[g]),
+            'min': float(mins[g]),
+            'max': float(maxs[g]),
+            'packets': int(n_packets[code])
         }
     
     return stats
 
-def plot_statistics_summary(df):
-    """Plota resumo estatístico"""
-    stats = generate_statistics(df)
+def plot_statistics_summary(df, stats=None):
+    """Plota resumo estatístico (reaproveita stats de generate_statistics se fornecido)"""
+    if stats is None:
+        stats = generate_statistics(df)
     
-    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 10))
+    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 10), constrained_layout=True)
     fig.suptitle('Resumo Estatístico dos Dados', fontsize=16)
     
     # Gráfico 1: Médias por tipo
@@ -168,25 +382,26 @@ def plot_statistics_summary(df):
     ax3.tick_params(axis='x', rotation=45)
     
     # Gráfico 4: Evolução de pacotes no tempo
-    packet_times = df.groupby('packet_id')['timestamp'].first().sort_values()
-    packet_ids = packet_times.index
-    times = pd.to_datetime(packet_times.values)
+    # Primeira linha de cada pacote, sem construir um GroupBy
+    first_per_packet = (df.drop_duplicates('packet_id', keep='first')[['packet_id', 'timestamp']]
+                        .sort_values('timestamp'))
+    # timestamp já é datetime64 (parse_dates na leitura): plotado sem reconversão
+    times = first_per_packet['timestamp'].to_numpy()
     
-    ax4.plot(times, packet_ids, 'bo-', markersize=4)
+    ax4.plot(times, first_per_packet['packet_id'].to_numpy(), 'bo-', markersize=4)
     ax4.set_title('Pacotes Recebidos ao Longo do Tempo')
     ax4.set_xlabel('Timestamp')
     ax4.set_ylabel('ID do Pacote')
     ax4.tick_params(axis='x', rotation=45)
     
-    plt.tight_layout()
     return fig
 
 def main():
     parser = argparse.ArgumentParser(description='Analisador de dados do Signal Analyzer')
     parser.add_argument('--csv', default='signal_analysis_data.csv', 
                        help='Arquivo CSV com os dados (padrão: signal_analysis_data.csv)')
-    parser.add_argument('--packet', type=int, 
-                       help='ID do pacote específico para análise')
+    parser.add_argument('--packet', type=int, nargs='+',
+                       help='ID(s) do(s) pacote(s) para análise')
     parser.add_argument('--evolution', choices=['signal_original', 'signal_filtered', 'fft_original', 'fft_filtered'],
                        help='Tipo de dado para análise de evolução temporal')
     parser.add_argument('--stats', action='store_true',
@@ -195,39 +410,59 @@ def main():
                        help='Salvar gráficos em arquivos PNG')
     parser.add_argument('--max-packets', type=int, default=10,
                        help='Máximo de pacotes para plotar na evolução (padrão: 10)')
+    parser.add_argument('--backend', choices=['pandas', 'polars'], default='pandas',
+                       help='Biblioteca usada na leitura do CSV (padrão: pandas)')
+    parser.add_argument('--no-show', action='store_true',
+                       help='Não abrir janelas (com --save, os pacotes são exportados em paralelo)')
     
     args = parser.parse_args()
     
+    if args.no_show:
+        plt.switch_backend('Agg')
+    
     # Verificar se arquivo existe
     if not os.path.exists(args.csv):
         print(f"[ERRO] Arquivo não encontrado: {args.csv}")
         return
     
-    # Carregar dados
-    df = load_data(args.csv)
+    # Carregar dados (com polars, apenas o pacote pedido é lido quando é a única análise)
+    packet_filter = args.packet if not (args.evolution or args.stats) else None
+    df = load_data(args.csv, args.backend, packet_id=packet_filter)
     if df is None:
         return
     
+    # Índice por pacote/tipo compartilhado pelos gráficos de pacotes
+    df_indexed = index_by_packet(df)
+    
     figures = []
+    saved = []
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
-    # Análise de pacote específico
+    # Análise de pacotes específicos
     if args.packet is not None:
-        fig = plot_packet_comparison(df, args.packet)
-        if fig:
-            figures.append(('packet_analysis', fig))
+        if args.save and args.no_show:
+            # Figuras independentes: exportadas diretamente, sem passar pelo pyplot
+            saved = export_packet_figures(df_indexed, args.packet, timestamp)
+        else:
+            for packet_id in args.packet:
+                fig = plot_packet_comparison(df_indexed, packet_id)
+                if fig:
+                    name = 'packet_analysis' if len(args.packet) == 1 else f'packet_{packet_id}_analysis'
+                    figures.append((name, fig))
     
     # Análise de evolução temporal
     if args.evolution:
-        fig = plot_signal_evolution(df, args.evolution, args.max_packets)
+        fig = plot_signal_evolution(df_indexed, args.evolution, args.max_packets)
         figures.append((f'evolution_{args.evolution}', fig))
     
     # Resumo estatístico
     if args.stats:
-        fig = plot_statistics_summary(df)
+        # Estatísticas calculadas uma vez para o gráfico e o texto
+        stats = generate_statistics(df)
+        fig = plot_statistics_summary(df, stats)
         figures.append(('statistics_summary', fig))
         
         # Imprimir estatísticas textuais
-        stats = generate_statistics(df)
         print("\n=== ESTATÍSTICAS DETALHADAS ===")
         for data_type, stat in stats.items():
             print(f"\n{data_type.replace('_', ' ').title()}:")
@@ -241,22 +476,22 @@ def main():
     if not any([args.packet is not None, args.evolution, args.stats]):
         last_packet = df['packet_id'].max()
         print(f"[INFO] Mostrando análise do último pacote: #{last_packet}")
-        fig = plot_packet_comparison(df, last_packet)
+        fig = plot_packet_comparison(df_indexed, last_packet)
         if fig:
             figures.append(('last_packet_analysis', fig))
     
     # Salvar gráficos se solicitado
     if args.save:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         for name, fig in figures:
             filename = f"{name}_{timestamp}.png"
-            fig.savefig(filename, dpi=300, bbox_inches='tight')
+            fig.savefig(filename, dpi=300)
             print(f"[INFO] Gráfico salvo: {filename}")
     
     # Mostrar gráficos
     if figures:
-        plt.show()
-    else:
+        if not args.no_show:
+            plt.show()
+    elif not saved:
         print("[INFO] Nenhum gráfico gerado. Use --help para ver opções disponíveis.")
 
 if __name__ == '__main__':
@@ -18,11 +18,88 @@ import os
 from typing import Dict, List, Optional, Tuple
 import warnings
 
+from csv_loader import read_signal_csv
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # numba é opcional - usa agregação do pandas
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+
+@njit(cache=True)
+def _sum_squares_by_group(labels, values, ss, cnt):
+    """
+    Acumula soma dos quadrados e contagem por grupo em uma única passada.
+    """
+    for i in range(values.size):
+        label = labels[i]
+        if label < 0:  # timestamp ausente (NaT)
+            continue
+        ss[label] += values[i] * values[i]
+        cnt[label] += 1
+
+
+def _sum_squares_by_timestamp(timestamps: pd.Series, amplitudes: np.ndarray) -> pd.DataFrame:
+    """
+    Calcula soma dos quadrados da amplitude e número de amostras por timestamp.
+
+    Parameters:
+    -----------
+    timestamps : pd.Series
+        Timestamp de cada amostra
+    amplitudes : np.ndarray
+        Amplitude de cada amostra
+
+    Returns:
+    --------
+    pd.DataFrame
+        Colunas 'ss' e 'cnt' indexadas por timestamp (ordem cronológica)
+    """
+    values = amplitudes.astype(np.float64, copy=False)
+
+    if len(values) == 0:
+        return pd.DataFrame({'ss': np.empty(0), 'cnt': np.empty(0, dtype=np.int64)},
+                            index=pd.DatetimeIndex([], name='timestamp'))
+
+    if timestamps.is_monotonic_increasing:
+        # CSV gravado em ordem cronológica: cada timestamp é um bloco contíguo
+        ts = timestamps.to_numpy()
+        starts = np.flatnonzero(np.r_[True, ts[1:] != ts[:-1]])
+        ss = np.add.reduceat(values * values, starts)
+        cnt = np.diff(np.r_[starts, len(values)])
+        uniques = ts[starts]
+    else:
+        codes, uniques = pd.factorize(timestamps, sort=True)
+        if NUMBA_AVAILABLE:
+            ss = np.zeros(len(uniques))
+            cnt = np.zeros(len(uniques), dtype=np.int64)
+            _sum_squares_by_group(codes, values, ss, cnt)
+        else:
+            valid = codes >= 0  # descarta timestamps ausentes (NaT)
+            ss = np.bincount(codes[valid], weights=values[valid] * values[valid],
+                             minlength=len(uniques))
+            cnt = np.bincount(codes[valid], minlength=len(uniques))
+
+    return pd.DataFrame({'ss': ss, 'cnt': cnt},
+                        index=pd.DatetimeIndex(uniques, name='timestamp'))
+
+
 class ESP32ToNILMTK:
     """
     Classe para conversão de dados ESP32 para formato NILMTK.
     """
     
+    # Opções dos datasets HDF5: chunks + shuffle + LZF (rápido e suportado
+    # também pelo PyTables usado pelo NILMTK)
+    HDF5_DATASET_OPTIONS = dict(chunks=True, compression='lzf', shuffle=True)
+    
+    # Chunk máximo (em amostras) dos datasets com Bitshuffle + LZ4
+    HDF5_BITSHUFFLE_CHUNK = 65536
+    
     def __init__(self, csv_file_path: str):
         """
         Inicializa o conversor com arquivo CSV da ESP32.
@@ -70,11 +147,8 @@ class ESP32ToNILMTK:
         print(f"📂 Carregando dados de: {self.csv_file_path}")
         
         try:
-            # Carrega dados CSV
-            self.raw_data = pd.read_csv(self.csv_file_path)
-            
-            # Converte timestamp para datetime
-            self.raw_data['timestamp'] = pd.to_datetime(self.raw_data['timestamp'])
+            # Carrega dados CSV (timestamp já convertido para datetime)
+            self.raw_data = read_signal_csv(self.csv_file_path)
             
             print(f"✅ Dados carregados: {len(self.raw_data)} registros")
             print(f"📊 Período: {self.raw_data['timestamp'].min()} até {self.raw_data['timestamp'].max()}")
@@ -86,7 +160,8 @@ class ESP32ToNILMTK:
             raise
     
     def extract_power_data(self, voltage_column: str = 'amplitude_or_magnitude', 
-                          current_column: str = 'amplitude_or_magnitude') -> pd.DataFrame:
+                          current_column: str = 'amplitude_or_magnitude',
+                          chunksize: Optional[int] = None) -> pd.DataFrame:
         """
         Extrai dados de potência dos sinais coletados.
         
@@ -96,51 +171,91 @@ class ESP32ToNILMTK:
             Nome da coluna com dados de tensão
         current_column : str
             Nome da coluna com dados de corrente
+        chunksize : int, optional
+            Se informado e o CSV ainda não foi carregado, lê o arquivo em
+            blocos desse número de linhas, limitando o uso de memória
             
         Returns:
         --------
         pd.DataFrame
             DataFrame com dados de potência no formato NILMTK
         """
-        if self.raw_data is None:
-            self.load_esp32_data()
-        
-        print("⚡ Processando dados de potência...")
-        
-        # Filtra apenas dados de sinal original (não FFT)
-        signal_data = self.raw_data[self.raw_data['data_type'] == 'signal_original'].copy()
-        
-        # Agrupa por timestamp para calcular potência
-        power_data = []
-        
-        for timestamp, group in signal_data.groupby('timestamp'):
-            # Assume que temos dados de tensão e corrente intercalados ou em canais diferentes
-            # Por simplicidade, vamos calcular potência RMS baseada na amplitude
+        if self.raw_data is None and chunksize:
+            print("⚡ Processando dados de potência (leitura em blocos)...")
+            sums = self._sum_squares_streaming(chunksize)
+        else:
+            if self.raw_data is None:
+                self.load_esp32_data()
             
-            amplitude_values = group['amplitude_or_magnitude'].values
+            print("⚡ Processando dados de potência...")
             
-            # Calcula potência RMS (simulada)
-            if len(amplitude_values) > 0:
-                # Conversão simplificada - ajustar conforme calibração real
-                voltage_rms = np.sqrt(np.mean(amplitude_values**2)) * 110  # Assume 110V nominal
-                current_rms = np.sqrt(np.mean(amplitude_values**2)) * 10   # Escala para corrente
-                power = voltage_rms * current_rms  # Potência aparente
-                
-                power_data.append({
-                    'timestamp': timestamp,
-                    'power': power,
-                    'voltage': voltage_rms,
-                    'current': current_rms
-                })
+            # Filtra apenas dados de sinal original (não FFT), sem copiar o DataFrame
+            signal_mask = (self.raw_data['data_type'] == 'signal_original').to_numpy()
+            timestamps = self.raw_data['timestamp'][signal_mask]
+            amplitudes = self.raw_data['amplitude_or_magnitude'].to_numpy()[signal_mask]
+            
+            # Agrupa por timestamp para calcular potência
+            # Assume que temos dados de tensão e corrente intercalados ou em canais diferentes
+            # Por simplicidade, vamos calcular potência RMS baseada na amplitude
+            sums = _sum_squares_by_timestamp(timestamps, amplitudes)
         
-        power_df = pd.DataFrame(power_data)
-        power_df.set_index('timestamp', inplace=True)
+        # Média dos quadrados por timestamp
+        mean_sq = sums['ss'] / sums['cnt']
+
+        # Calcula potência RMS (simulada)
+        # Conversão simplificada - ajustar conforme calibração real
+        # RMS calculado uma única vez e reaproveitado nas duas escalas
+        # (acumulação em float64, resultado em float32 - suficiente para o ADC)
+        rms = np.sqrt(mean_sq.to_numpy()).astype(np.float32)
+        voltage_rms = rms * np.float32(110.0)  # Assume 110V nominal
+        current_rms = rms * np.float32(10.0)   # Escala para corrente
+        power = voltage_rms * current_rms  # Potência aparente
+
+        # DataFrame construído uma única vez a partir dos arrays, sem cópia
+        power_df = pd.DataFrame({
+            'power': power,
+            'voltage': voltage_rms,
+            'current': current_rms
+        }, index=mean_sq.index, copy=False)
         
         print(f"✅ {len(power_df)} pontos de potência extraídos")
         print(f"📈 Potência média: {power_df['power'].mean():.2f} W")
         
         return power_df
     
+    def _sum_squares_streaming(self, chunksize: int) -> pd.DataFrame:
+        """
+        Acumula soma dos quadrados e contagem por timestamp lendo o CSV em blocos.
+        
+        Parameters:
+        -----------
+        chunksize : int
+            Número de linhas por bloco
+            
+        Returns:
+        --------
+        pd.DataFrame
+            Colunas 'ss' e 'cnt' indexadas por timestamp
+        """
+        partials = []
+        total_rows = 0
+        
+        for chunk in read_signal_csv(self.csv_file_path, chunksize=chunksize):
+            total_rows += len(chunk)
+            signal_mask = (chunk['data_type'] == 'signal_original').to_numpy()
+            partials.append(_sum_squares_by_timestamp(
+                chunk['timestamp'][signal_mask],
+                chunk['amplitude_or_magnitude'].to_numpy()[signal_mask]
+            ))
+        
+        print(f"✅ Dados lidos em blocos: {total_rows} registros")
+        
+        if not partials:
+            return _sum_squares_by_timestamp(pd.Series([], dtype='datetime64[ns]'), np.empty(0))
+        
+        # Um mesmo timestamp pode estar dividido entre dois blocos consecutivos
+        return pd.concat(partials).groupby(level=0).sum()
+    
     def create_nilmtk_format(self, power_data: pd.DataFrame, 
                            building_number: int = 1,
                            meter_number: int = 1) -> Dict:
@@ -169,12 +284,12 @@ class ESP32ToNILMTK:
                 'elec': {
                     'meter1': {
                         'power': {
-                            'active': power_data['power'].values,
-                            'reactive': np.zeros(len(power_data)),  # Placeholder
-                            'apparent': power_data['power'].values
+                            'active': power_data['power'].to_numpy(np.float32),
+                            'reactive': np.zeros(len(power_data), dtype=np.float32),  # Placeholder
+                            'apparent': power_data['power'].to_numpy(np.float32)
                         },
-                        'voltage': power_data['voltage'].values,
-                        'current': power_data['current'].values,
+                        'voltage': power_data['voltage'].to_numpy(np.float32),
+                        'current': power_data['current'].to_numpy(np.float32),
                         'timestamps': power_data.index
                     }
                 },
@@ -212,8 +327,39 @@ class ESP32ToNILMTK:
         
         return nilmtk_data
     
+    def _hdf5_dataset_options(self, n_samples: int, compression: str = 'lzf') -> Dict:
+        """
+        Opções de create_dataset para a compressão escolhida.
+        
+        Parameters:
+        -----------
+        n_samples : int
+            Número de amostras dos datasets
+        compression : str
+            'lzf' (padrão, legível por qualquer h5py/PyTables) ou
+            'bitshuffle' (Bitshuffle + LZ4 via hdf5plugin: leitura mais
+            rápida, mas o leitor também precisa do hdf5plugin)
+            
+        Returns:
+        --------
+        Dict
+            Argumentos nomeados para create_dataset
+        """
+        if compression == 'bitshuffle':
+            try:
+                import hdf5plugin
+                chunk = max(1, min(n_samples, self.HDF5_BITSHUFFLE_CHUNK))
+                return dict(chunks=(chunk,), **hdf5plugin.Bitshuffle(cname='lz4'))
+            except ImportError:
+                print("⚠️  hdf5plugin não instalado, usando compressão LZF")
+        elif compression != 'lzf':
+            raise ValueError(f"Compressão não suportada: {compression}")
+        
+        return self.HDF5_DATASET_OPTIONS
+    
     def save_to_hdf5(self, output_path: str, 
-                     building_number: int = 1) -> str:
+                     building_number: int = 1,
+                     compression: str = 'lzf') -> str:
         """
         Salva dados no formato HDF5 compatível com NILMTK.
         
@@ -223,6 +369,8 @@ class ESP32ToNILMTK:
             Caminho para salvar o arquivo HDF5
         building_number : int
             Número do prédio
+        compression : str
+            Compressão dos datasets: 'lzf' (padrão) ou 'bitshuffle'
             
         Returns:
         --------
@@ -235,9 +383,11 @@ class ESP32ToNILMTK:
         print(f"💾 Salvando em HDF5: {output_path}")
         
         try:
+            building_data = self.nilmtk_data[f'building{building_number}']
+            meter_data = building_data['elec']['meter1']
+            h5opts = self._hdf5_dataset_options(len(meter_data['timestamps']), compression)
+            
             with h5py.File(output_path, 'w') as f:
-                building_data = self.nilmtk_data[f'building{building_number}']
-                
                 # Cria grupo do prédio
                 building_group = f.create_group(f'building{building_number}')
                 
@@ -245,23 +395,22 @@ class ESP32ToNILMTK:
                 elec_group = building_group.create_group('elec')
                 meter_group = elec_group.create_group('meter1')
                 
-                # Salva dados de potência
-                meter_data = building_data['elec']['meter1']
-                
                 # Timestamps - converte para Unix timestamp
                 timestamps = pd.DatetimeIndex(meter_data['timestamps'])
                 timestamps_unix = timestamps.astype(np.int64) // 10**9
-                meter_group.create_dataset('timestamps', data=timestamps_unix)
+                meter_group.create_dataset('timestamps', data=timestamps_unix, **h5opts)
                 
-                # Dados de potência
+                # Dados de potência (float32 é suficiente para a faixa dinâmica do ADC)
                 power_group = meter_group.create_group('power')
-                power_group.create_dataset('active', data=meter_data['power']['active'])
-                power_group.create_dataset('reactive', data=meter_data['power']['reactive'])
-                power_group.create_dataset('apparent', data=meter_data['power']['apparent'])
+                for key in ('active', 'reactive', 'apparent'):
+                    power_group.create_dataset(key, data=np.asarray(meter_data['power'][key], dtype=np.float32),
+                                               **h5opts)
                 
                 # Dados de tensão e corrente
-                meter_group.create_dataset('voltage', data=meter_data['voltage'])
-                meter_group.create_dataset('current', data=meter_data['current'])
+                meter_group.create_dataset('voltage', data=np.asarray(meter_data['voltage'], dtype=np.float32),
+                                           **h5opts)
+                meter_group.create_dataset('current', data=np.asarray(meter_data['current'], dtype=np.float32),
+                                           **h5opts)
                 
                 # Metadata - salva apenas valores serializáveis
                 metadata_group = building_group.create_group('metadata')
@@ -340,7 +489,9 @@ class ESP32ToNILMTK:
 
 def convert_esp32_to_nilmtk(csv_file: str, 
                            output_hdf5: str,
-                           building_number: int = 1) -> str:
+                           building_number: int = 1,
+                           chunksize: Optional[int] = 1_000_000,
+                           compression: str = 'lzf') -> str:
     """
     Função utilitária para conversão completa ESP32 → NILMTK.
     
@@ -352,6 +503,10 @@ def convert_esp32_to_nilmtk(csv_file: str,
         Caminho de saída do arquivo HDF5
     building_number : int
         Número do prédio
+    chunksize : int, optional
+        Linhas por bloco na leitura do CSV; None carrega o arquivo inteiro
+    compression : str
+        Compressão do HDF5: 'lzf' (padrão) ou 'bitshuffle' (requer hdf5plugin)
         
     Returns:
     --------
@@ -365,17 +520,18 @@ def convert_esp32_to_nilmtk(csv_file: str,
         # Cria conversor
         converter = ESP32ToNILMTK(csv_file)
         
-        # Carrega dados
-        converter.load_esp32_data()
+        # Carrega dados (em blocos, sem manter o CSV inteiro em memória)
+        if not chunksize:
+            converter.load_esp32_data()
         
         # Extrai dados de potência
-        power_data = converter.extract_power_data()
+        power_data = converter.extract_power_data(chunksize=chunksize)
         
         # Converte para formato NILMTK
         converter.create_nilmtk_format(power_data, building_number)
         
         # Salva em HDF5
-        converter.save_to_hdf5(output_hdf5, building_number)
+        converter.save_to_hdf5(output_hdf5, building_number, compression)
         
         # Gera relatório
         report = converter.generate_summary_report()
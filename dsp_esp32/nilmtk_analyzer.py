@@ -13,23 +13,224 @@ Este módulo permite:
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime, timedelta
 import warnings
 from typing import Dict, List, Optional, Tuple, Union
+from contextlib import nullcontext
+import io
+import math
 import os
 
+try:
+    import hdf5plugin  # noqa: F401 - registra filtros extras (Bitshuffle/LZ4, Blosc2) no h5py
+except ImportError:  # hdf5plugin é opcional - necessário só para arquivos com esses filtros
+    pass
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # numba é opcional - os kernels rodam como Python puro
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        return lambda func: func
+
 # Configuração de visualização
 plt.style.use('default')
-sns.set_palette("husl")
+_PALETTE_READY = False
 warnings.filterwarnings('ignore')
 
+# Tipos de evento (códigos 0 e 1 da coluna categórica event_type)
+EVENT_TYPES = ['turn_on', 'turn_off']
+
+# Amostras por bloco na varredura de saltos de potência (cabe no cache L2)
+STEP_TILE = 65536
+
+# Amostras lidas do HDF5 por bloco na detecção de eventos em streaming
+STREAM_BLOCK = 1 << 20
+
+# Número máximo de pontos desenhados por série (a tela não resolve mais que isso)
+PLOT_MAX_POINTS = 5000
+
+# Representação int64 de NaT e duração de um dia em nanossegundos
+NAT_NS = np.iinfo(np.int64).min
+DAY_NS = 86_400_000_000_000
+HOUR_NS = 3_600_000_000_000
+
+
+@njit(cache=True)
+def _keep_mask(ts_ns, min_ns):
+    """
+    Marca os eventos mantidos: cada um precisa estar a pelo menos min_ns
+    do último evento mantido.
+    """
+    keep = np.zeros(ts_ns.size, dtype=np.bool_)
+    if ts_ns.size == 0:
+        return keep
+    keep[0] = True
+    last_kept = ts_ns[0]
+    for i in range(1, ts_ns.size):
+        if ts_ns[i] - last_kept >= min_ns:
+            keep[i] = True
+            last_kept = ts_ns[i]
+    return keep
+
+
+@njit(cache=True)
+def _power_stats_kernel(power):
+    """
+    Soma, média, desvio (Welford), mínimo, máximo, faltantes e zeros em
+    uma única passada, ignorando NaN.
+    """
+    n = 0
+    n_missing = 0
+    n_zero = 0
+    total = 0.0
+    mean = 0.0
+    m2 = 0.0
+    min_p = np.inf
+    max_p = -np.inf
+    for i in range(power.size):
+        x = np.float64(power[i])
+        if x != x:
+            n_missing += 1
+            continue
+        if x == 0.0:
+            n_zero += 1
+        n += 1
+        total += x
+        delta = x - mean
+        mean += delta / n
+        m2 += delta * (x - mean)
+        if x < min_p:
+            min_p = x
+        if x > max_p:
+            max_p = x
+    if n == 0:
+        return np.nan, np.nan, np.nan, np.nan, 0.0, n_missing, n_zero
+    std = np.sqrt(m2 / (n - 1)) if n > 1 else np.nan
+    return mean, max_p, min_p, std, total, n_missing, n_zero
+
+
+@njit(cache=True)
+def _bucket_sums_kernel(ts_ns, power, origin, freq_ns, n_buckets):
+    """
+    Soma e contagem da potência por intervalo de freq_ns a partir de origin,
+    em uma única passada (ignora NaN e NaT).
+    """
+    sums = np.zeros(n_buckets)
+    counts = np.zeros(n_buckets, dtype=np.int64)
+    for i in range(ts_ns.size):
+        x = np.float64(power[i])
+        if x != x or ts_ns[i] == NAT_NS:
+            continue
+        b = (ts_ns[i] - origin) // freq_ns
+        sums[b] += x
+        counts[b] += 1
+    return sums, counts
+
+
+def _step_dtype(dtype: np.dtype) -> np.dtype:
+    """
+    Tipo usado nas diferenças entre amostras: floats mantêm o próprio tipo,
+    inteiros (ex.: int16 do ADC) são alargados para a diferença não transbordar.
+    """
+    if dtype.kind == 'f':
+        return dtype
+    return np.dtype(np.int32) if dtype.itemsize <= 2 else np.dtype(np.int64)
+
+
+def _find_steps(power: np.ndarray, threshold: float, tile: int = STEP_TILE) -> np.ndarray:
+    """
+    Posições i em que |power[i+1] - power[i]| > threshold.
+    
+    A varredura é feita em blocos de tile amostras com buffers reaproveitados,
+    no tipo nativo dos dados: não cria arrays temporários do tamanho da série.
+    """
+    n = power.size - 1
+    if n <= 0:
+        return np.empty(0, dtype=np.intp)
+    
+    work = _step_dtype(power.dtype)
+    if work.kind != 'f':
+        # Para diferenças inteiras, |d| > t equivale a |d| > floor(t)
+        threshold = math.floor(threshold)
+    
+    diff = np.empty(min(tile, n), dtype=work)
+    over = np.empty(diff.size, dtype=np.bool_)
+    hits = []
+    for start in range(0, n, tile):
+        stop = min(start + tile, n)
+        d = diff[:stop - start]
+        m = over[:stop - start]
+        np.subtract(power[start + 1:stop + 1], power[start:stop], out=d, dtype=work)
+        np.abs(d, out=d)
+        np.greater(d, threshold, out=m)
+        if m.any():
+            hits.append(np.flatnonzero(m) + start)
+    
+    return np.concatenate(hits) if hits else np.empty(0, dtype=np.intp)
+
+
+def _setup_palette() -> None:
+    """
+    Aplica a paleta "husl" do seaborn na primeira vez que um gráfico é gerado
+    (seaborn é importado só aqui, não no carregamento do módulo).
+    """
+    global _PALETTE_READY
+    if _PALETTE_READY:
+        return
+    _PALETTE_READY = True
+    try:
+        import seaborn as sns
+        sns.set_palette("husl")
+    except ImportError:  # seaborn é opcional - mantém as cores padrão do matplotlib
+        pass
+
+
+def _decimate(data, n: int = PLOT_MAX_POINTS):
+    """
+    Reduz uma Series/DataFrame a no máximo ~n pontos por amostragem com passo fixo.
+    """
+    step = max(1, len(data) // n)
+    return data.iloc[::step] if step > 1 else data
+
+
+def _power_stats(power: np.ndarray) -> Tuple:
+    """
+    Estatísticas da série de potência com a mesma semântica do pandas
+    (NaN ignorado, desvio com ddof=1).
+    
+    Returns:
+    --------
+    tuple
+        (média, máximo, mínimo, desvio, soma, faltantes, zeros)
+    """
+    if NUMBA_AVAILABLE:
+        return _power_stats_kernel(power)
+    
+    missing = np.isnan(power)
+    valid = power[~missing] if missing.any() else power
+    n_missing = int(missing.sum())
+    n_zero = int(np.count_nonzero(valid == 0))
+    if valid.size == 0:
+        return np.nan, np.nan, np.nan, np.nan, 0.0, n_missing, n_zero
+    std = float(np.std(valid, dtype=np.float64, ddof=1)) if valid.size > 1 else np.nan
+    return (float(np.mean(valid, dtype=np.float64)), float(valid.max()), float(valid.min()),
+            std, float(np.sum(valid, dtype=np.float64)), n_missing, n_zero)
+
+
 class NILMTKAnalyzer:
     """
     Classe para análise de dados NILMTK gerados pela ESP32.
     """
     
-    def __init__(self, hdf5_file: Optional[str] = None):
+    # Cache de chunks do HDF5 ao abrir o arquivo: 64 MB mantêm residentes os
+    # chunks das colunas do medidor lidas em sequência; nslots primo (~10x o
+    # número de chunks em uso) reduz colisões na tabela hash do cache
+    HDF5_CHUNK_CACHE = dict(rdcc_nbytes=64 * 1024 * 1024, rdcc_nslots=100003, rdcc_w0=0.75)
+    
+    def __init__(self, hdf5_file: Optional[str] = None, preload: bool = False):
         """
         Inicializa o analisador NILMTK.
         
@@ -37,12 +238,24 @@ class NILMTKAnalyzer:
         -----------
         hdf5_file : str, optional
             Caminho para arquivo HDF5 NILMTK
+        preload : bool
+            Se True, o arquivo é lido uma vez para a memória (driver 'core')
+            e mantido aberto: recarregamentos não voltam ao disco.
+            Use close() para liberar a memória.
         """
         self.hdf5_file = hdf5_file
+        self.preload = preload
+        self._h5 = None
         self.dataset = None
         self.power_data = None
         self.metadata = None
         
+        # Coluna de potência como ndarray, reaproveitada por estatísticas e gráficos
+        self._p_arr = None
+        self._p_source = None
+        self._hours = None
+        self._hours_source = None
+        
     def load_dataset(self, hdf5_file: Optional[str] = None) -> bool:
         """
         Carrega dataset NILMTK.
@@ -80,6 +293,39 @@ class NILMTKAnalyzer:
             print(f"❌ Erro ao carregar dataset: {e}")
             return False
     
+    def _open_hdf5(self):
+        """
+        Abre o arquivo HDF5 para leitura.
+        
+        Com preload, retorna a imagem em memória mantida aberta entre
+        recarregamentos (em um contexto que não a fecha).
+        
+        Returns:
+        --------
+        contexto com h5py.File
+            Arquivo aberto para uso em um bloco with
+        """
+        import h5py
+        
+        if not self.preload:
+            return h5py.File(self.hdf5_file, 'r', **self.HDF5_CHUNK_CACHE)
+        
+        if self._h5 is None or not self._h5.id.valid or self._h5.filename != self.hdf5_file:
+            self.close()
+            # Arquivo inteiro copiado para a RAM; backing_store=False nunca grava de volta
+            self._h5 = h5py.File(self.hdf5_file, 'r', driver='core', backing_store=False,
+                                 **self.HDF5_CHUNK_CACHE)
+        return nullcontext(self._h5)
+    
+    def close(self) -> None:
+        """
+        Fecha o arquivo HDF5 mantido em memória (modo preload).
+        """
+        if self._h5 is not None:
+            if self._h5.id.valid:
+                self._h5.close()
+            self._h5 = None
+    
     def _load_manual(self) -> bool:
         """
         Carregamento manual do HDF5 (quando NILMTK não está disponível).
@@ -90,28 +336,33 @@ class NILMTKAnalyzer:
             True se carregado com sucesso
         """
         try:
-            import h5py
-            
-            with h5py.File(self.hdf5_file, 'r') as f:
-                # Assume building1/elec/meter1
-                building_key = list(f.keys())[0]
-                meter_path = f"{building_key}/elec/meter1"
+            with self._open_hdf5() as f:
+                meter_path = self._meter_path(f)
                 
                 # Carrega timestamps - converte de Unix timestamp para datetime
-                timestamps_unix = f[f"{meter_path}/timestamps"][:]
-                timestamps = pd.to_datetime(timestamps_unix, unit='s')
+                timestamps_unix = self._read_dataset(f[f"{meter_path}/timestamps"])
+                timestamps = self._parse_timestamps(timestamps_unix)
                 
-                # Carrega dados de potência
-                power_active = f[f"{meter_path}/power/active"][:]
-                voltage = f[f"{meter_path}/voltage"][:]
-                current = f[f"{meter_path}/current"][:]
+                # Carrega dados de potência, tensão e corrente em um único bloco
+                # (3, N): cada linha é contígua e recebe um dataset via read_direct
+                columns = {
+                    'power': f[f"{meter_path}/power/active"],
+                    'voltage': f[f"{meter_path}/voltage"],
+                    'current': f[f"{meter_path}/current"]
+                }
+                block = np.empty((len(columns), len(timestamps)),
+                                 dtype=np.result_type(*(dset.dtype for dset in columns.values())))
+                print(f"🗜️  Filtros HDF5: {', '.join(self._dataset_filters(columns['power'])) or 'nenhum'}")
+                # Leituras sequenciais de propósito: o h5py serializa todas as chamadas
+                # à biblioteca HDF5 (lock global), então um pool de threads não
+                # sobrepõe I/O nem descompressão, só acrescenta overhead
+                for row, dset in zip(block, columns.values()):
+                    self._read_dataset(dset, out=row)
                 
-                # Cria DataFrame
-                self.power_data = pd.DataFrame({
-                    'power': power_active,
-                    'voltage': voltage,
-                    'current': current
-                }, index=timestamps)
+                # Cria DataFrame: a transposta corresponde ao layout interno do
+                # pandas, então as três colunas ficam em um só bloco, sem cópia
+                self.power_data = pd.DataFrame(block.T, index=timestamps,
+                                               columns=list(columns), copy=False)
                 
                 print("✅ Dataset carregado manualmente")
                 return True
@@ -120,6 +371,110 @@ class NILMTKAnalyzer:
             print(f"❌ Erro no carregamento manual: {e}")
             return False
     
+    @staticmethod
+    def _meter_path(f) -> str:
+        """
+        Caminho do medidor no arquivo HDF5 (assume building1/elec/meter1).
+        """
+        building_key = list(f.keys())[0]
+        return f"{building_key}/elec/meter1"
+    
+    @staticmethod
+    def _parse_timestamps(timestamps_unix: np.ndarray) -> pd.DatetimeIndex:
+        """
+        Converte timestamps Unix (segundos) do HDF5 para DatetimeIndex.
+        """
+        if timestamps_unix.dtype.kind in 'iu':
+            # Inteiros em segundos: conversão direta de unidade no NumPy, sem parsing
+            return pd.DatetimeIndex(timestamps_unix.astype('datetime64[s]').astype('datetime64[ns]'))
+        # Segundos fracionários (float) seguem pelo pandas
+        return pd.to_datetime(timestamps_unix, unit='s')
+    
+    @staticmethod
+    def _read_dataset(dset, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Lê um dataset HDF5 inteiro direto em um array pré-alocado.
+        
+        Parameters:
+        -----------
+        dset : h5py.Dataset
+            Dataset a ser lido
+        out : np.ndarray, optional
+            Array C-contíguo de destino (mesmo formato do dataset); se
+            omitido, é alocado com o dtype do dataset
+            
+        Returns:
+        --------
+        np.ndarray
+            Array preenchido com os dados do dataset
+        """
+        if out is None:
+            out = np.empty(dset.shape, dtype=dset.dtype)
+        if out.size:
+            # read_direct preenche o array no lugar, sem buffer intermediário
+            dset.read_direct(out)
+        return out
+    
+    @staticmethod
+    def _dataset_filters(dset) -> List[str]:
+        """
+        Lista os filtros (compressão, shuffle...) aplicados a um dataset HDF5.
+        
+        Parameters:
+        -----------
+        dset : h5py.Dataset
+            Dataset a ser inspecionado
+            
+        Returns:
+        --------
+        List[str]
+            Nomes dos filtros, na ordem do pipeline
+        """
+        plist = dset.id.get_create_plist()
+        names = []
+        for i in range(plist.get_nfilters()):
+            code, _, _, name = plist.get_filter(i)
+            # Plugins costumam anexar uma descrição ao nome ("bitshuffle; see ...")
+            names.append(name.decode(errors='replace').split(';')[0] if name else str(code))
+        return names
+    
+    def _power_array(self) -> np.ndarray:
+        """
+        Retorna a coluna de potência como ndarray, extraída uma única vez
+        para cada DataFrame carregado em power_data.
+        
+        Returns:
+        --------
+        np.ndarray
+            Valores de potência (W)
+        """
+        if self._p_arr is None or self._p_source is not self.power_data:
+            self._p_arr = self.power_data['power'].to_numpy()
+            self._p_source = self.power_data
+        return self._p_arr
+    
+    def _hour_array(self) -> np.ndarray:
+        """
+        Retorna a hora do dia de cada amostra (int8, -1 para NaT), calculada
+        uma única vez a partir dos nanossegundos do índice.
+        
+        Returns:
+        --------
+        np.ndarray
+            Horas do dia (0-23)
+        """
+        if self._hours is None or self._hours_source is not self.power_data:
+            index = self.power_data.index
+            if index.tz is None:
+                ts_ns = index.asi8
+                self._hours = ((ts_ns // HOUR_NS) % 24).astype(np.int8)
+                self._hours[ts_ns == NAT_NS] = -1
+            else:
+                # Com fuso horário a hora local depende do offset: usa o pandas
+                self._hours = index.hour.to_numpy(dtype=np.float64, na_value=-1).astype(np.int8)
+            self._hours_source = self.power_data
+        return self._hours
+    
     def get_power_data(self, building: int = 1, meter: int = 1) -> pd.DataFrame:
         """
         Extrai dados de potência do dataset.
@@ -157,6 +512,53 @@ class NILMTKAnalyzer:
             print(f"❌ Erro ao extrair dados de potência: {e}")
             return pd.DataFrame()
     
+    def _resample_means(self, resample_freq: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Média da potência por intervalo de reamostragem, equivalente a
+        resample(resample_freq).mean() sem os intervalos vazios.
+        
+        Parameters:
+        -----------
+        resample_freq : str
+            Frequência de reamostragem (ex: '1H', '1D')
+            
+        Returns:
+        --------
+        Tuple[np.ndarray, np.ndarray]
+            Início de cada intervalo (datetime64[ns]) e potência média
+        """
+        offset = pd.tseries.frequencies.to_offset(resample_freq)
+        index = self.power_data.index
+        
+        if not isinstance(offset, pd.offsets.Tick) or not isinstance(index, pd.DatetimeIndex) or index.tz is not None:
+            # Frequências de calendário (mês, ano...) seguem pelo pandas
+            resampled = self.power_data['power'].resample(resample_freq).mean().dropna()
+            return resampled.index.to_numpy(), resampled.to_numpy()
+        
+        ts_ns = index.asi8
+        valid = ts_ns != NAT_NS
+        if not valid.any():
+            return np.array([], dtype='datetime64[ns]'), np.array([])
+        
+        # Mesma origem do resample (origin='start_day'): meia-noite do primeiro dia
+        first = ts_ns.min(where=valid, initial=np.iinfo(np.int64).max)
+        origin = first - first % DAY_NS
+        freq_ns = offset.nanos
+        n_buckets = int((ts_ns.max() - origin) // freq_ns) + 1
+        
+        power = self._power_array()
+        if NUMBA_AVAILABLE:
+            sums, counts = _bucket_sums_kernel(ts_ns, power, origin, freq_ns, n_buckets)
+        else:
+            keep = valid & ~np.isnan(power)
+            labels = (ts_ns[keep] - origin) // freq_ns
+            sums = np.bincount(labels, weights=power[keep], minlength=n_buckets)
+            counts = np.bincount(labels, minlength=n_buckets)
+        
+        filled = np.flatnonzero(counts)
+        starts = (origin + filled * freq_ns).astype('datetime64[ns]')
+        return starts, sums[filled] / counts[filled]
+    
     def analyze_consumption_patterns(self, resample_freq: str = '1H') -> Dict:
         """
         Analisa padrões de consumo.
@@ -176,27 +578,37 @@ class NILMTKAnalyzer:
             
         print("📊 Analisando padrões de consumo...")
         
-        # Reamostragem
-        resampled = self.power_data['power'].resample(resample_freq).mean()
+        # Reamostragem: médias por intervalo em uma passada, sem Series intermediária
+        bucket_starts, bucket_means = self._resample_means(resample_freq)
+        if bucket_means.size:
+            peak_hour = pd.Timestamp(bucket_starts[np.argmax(bucket_means)]).hour
+            min_hour = pd.Timestamp(bucket_starts[np.argmin(bucket_means)]).hour
+            daily_variation = float(np.std(bucket_means, ddof=1)) if bucket_means.size > 1 else np.nan
+        else:
+            peak_hour, min_hour, daily_variation = 0, 0, 0
+        
+        # Todas as estatísticas da potência em uma única passada pelos dados
+        (mean_power, max_power, min_power, std_power,
+         sum_power, missing_values, zero_values) = _power_stats(self._power_array())
         
         # Estatísticas básicas
         stats = {
             'consumption_stats': {
-                'mean_power': float(self.power_data['power'].mean()),
-                'max_power': float(self.power_data['power'].max()),
-                'min_power': float(self.power_data['power'].min()),
-                'std_power': float(self.power_data['power'].std()),
-                'total_energy': float(self.power_data['power'].sum() / 3600),  # Wh
+                'mean_power': float(mean_power),
+                'max_power': float(max_power),
+                'min_power': float(min_power),
+                'std_power': float(std_power),
+                'total_energy': float(sum_power / 3600),  # Wh
             },
             'temporal_patterns': {
-                'peak_hour': resampled.idxmax().hour if not resampled.empty else 0,
-                'min_hour': resampled.idxmin().hour if not resampled.empty else 0,
-                'daily_variation': float(resampled.std()) if not resampled.empty else 0
+                'peak_hour': peak_hour,
+                'min_hour': min_hour,
+                'daily_variation': daily_variation
             },
             'data_quality': {
                 'total_samples': len(self.power_data),
-                'missing_values': int(self.power_data['power'].isna().sum()),
-                'zero_values': int((self.power_data['power'] == 0).sum()),
+                'missing_values': int(missing_values),
+                'zero_values': int(zero_values),
                 'sampling_rate': self._estimate_sampling_rate()
             }
         }
@@ -215,12 +627,14 @@ class NILMTKAnalyzer:
         """
         if len(self.power_data) < 2:
             return 0.0
-            
-        time_diff = self.power_data.index[1] - self.power_data.index[0]
-        return 1.0 / time_diff.total_seconds()
+        
+        # Diferença direto nos nanossegundos do índice, sem criar Timedelta
+        ts_ns = self.power_data.index.asi8
+        return 1e9 / float(ts_ns[1] - ts_ns[0])
     
     def detect_appliance_events(self, threshold: float = 50.0, 
-                               min_duration: str = '10s') -> pd.DataFrame:
+                               min_duration: str = '10s',
+                               streaming: bool = False) -> pd.DataFrame:
         """
         Detecta eventos de aparelhos (liga/desliga).
         
@@ -230,38 +644,46 @@ class NILMTKAnalyzer:
             Limiar de potência para detecção (W)
         min_duration : str
             Duração mínima do evento
+        streaming : bool
+            Se True, lê a potência direto do HDF5 em blocos, sem carregar a
+            série inteira (memória limitada a um bloco em gravações longas)
             
         Returns:
         --------
         pd.DataFrame
             DataFrame com eventos detectados
         """
-        if self.power_data is None:
+        if not streaming and self.power_data is None:
             self.get_power_data()
             
         print(f"🔍 Detectando eventos de aparelhos (limiar: {threshold}W)...")
         
-        power_series = self.power_data['power']
-        
-        # Calcula diferença de potência
-        power_diff = power_series.diff()
-        
-        # Detecta eventos significativos
-        events = []
+        if streaming:
+            timestamps, values = self._scan_events_hdf5(threshold)
+        else:
+            power = self._power_array()
+            
+            # Detecta eventos significativos: posições dos saltos de potência
+            # (o evento é a amostra seguinte, pos + 1; a primeira amostra não tem anterior)
+            pos = _find_steps(power, threshold)
+            
+            # Colunas tipadas pré-alocadas (antes, depois) preenchidas com take
+            values = np.empty((2, pos.size), dtype=power.dtype)
+            np.take(power, pos, out=values[0])
+            np.take(power, pos + 1, out=values[1])
+            timestamps = np.take(self.power_data.index.to_numpy(), pos + 1)
         
-        for i, diff in enumerate(power_diff):
-            if abs(diff) > threshold:
-                event_type = 'turn_on' if diff > 0 else 'turn_off'
-                
-                events.append({
-                    'timestamp': power_series.index[i],
-                    'event_type': event_type,
-                    'power_change': diff,
-                    'power_before': power_series.iloc[i-1] if i > 0 else 0,
-                    'power_after': power_series.iloc[i]
-                })
+        # A mudança usa o tipo alargado das diferenças
+        power_change = np.subtract(values[1], values[0], dtype=_step_dtype(values.dtype))
         
-        events_df = pd.DataFrame(events)
+        events_df = pd.DataFrame({
+            'timestamp': timestamps,
+            'event_type': pd.Categorical.from_codes((power_change <= 0).astype(np.int8),
+                                                    categories=EVENT_TYPES),
+            'power_change': power_change,
+            'power_before': values[0],
+            'power_after': values[1]
+        }, copy=False)
         
         if not events_df.empty:
             # Filtra por duração mínima
@@ -270,6 +692,78 @@ class NILMTKAnalyzer:
         print(f"✅ {len(events_df)} eventos detectados")
         return events_df
     
+    def _scan_events_hdf5(self, threshold: float,
+                          block_size: int = STREAM_BLOCK) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Varre a potência do HDF5 em blocos alinhados aos chunks do dataset,
+        procurando saltos acima do limiar.
+        
+        A última amostra de cada bloco é carregada para o início do próximo,
+        de modo que saltos na fronteira entre blocos também são detectados.
+        
+        Parameters:
+        -----------
+        threshold : float
+            Limiar de potência para detecção (W)
+        block_size : int
+            Número aproximado de amostras por bloco
+            
+        Returns:
+        --------
+        Tuple[np.ndarray, np.ndarray]
+            Timestamps dos eventos (datetime64[ns]) e array (2, k) com a
+            potência antes e depois de cada evento
+        """
+        if not self.hdf5_file:
+            raise ValueError("Caminho do arquivo HDF5 não especificado")
+        
+        with self._open_hdf5() as f:
+            meter_path = self._meter_path(f)
+            power_dset = f[f"{meter_path}/power/active"]
+            ts_dset = f[f"{meter_path}/timestamps"]
+            n = power_dset.shape[0]
+            
+            # Bloco múltiplo do chunk: cada chunk é descomprimido uma única vez
+            chunk = power_dset.chunks[0] if power_dset.chunks else block_size
+            step = max(1, block_size // chunk) * chunk
+            
+            buf = np.empty(min(step, n) + 1, dtype=power_dset.dtype)
+            ts_buf = np.empty(min(step, n), dtype=ts_dset.dtype)
+            ts_parts, before_parts, after_parts = [], [], []
+            has_tail = False
+            
+            for start in range(0, n, step):
+                stop = min(start + step, n)
+                m = stop - start
+                power_dset.read_direct(buf, source_sel=np.s_[start:stop], dest_sel=np.s_[1:m + 1])
+                
+                # Com a amostra anterior em buf[0], a posição local p corresponde
+                # ao salto entre as amostras globais start + p - 1 e start + p
+                if has_tail:
+                    block, first = buf[:m + 1], start - 1
+                else:
+                    block, first = buf[1:m + 1], start
+                
+                pos = _find_steps(block, threshold)
+                if pos.size:
+                    ts_dset.read_direct(ts_buf, source_sel=np.s_[start:stop], dest_sel=np.s_[0:m])
+                    ts_parts.append(ts_buf[first + pos + 1 - start])
+                    before_parts.append(block[pos])
+                    after_parts.append(block[pos + 1])
+                
+                buf[0] = block[-1]
+                has_tail = True
+        
+        values = np.empty((2, sum(p.size for p in before_parts)), dtype=buf.dtype)
+        if before_parts:
+            np.concatenate(before_parts, out=values[0])
+            np.concatenate(after_parts, out=values[1])
+            timestamps = self._parse_timestamps(np.concatenate(ts_parts)).to_numpy()
+        else:
+            timestamps = np.array([], dtype='datetime64[ns]')
+        
+        return timestamps, values
+    
     def _filter_events_by_duration(self, events_df: pd.DataFrame, 
                                   min_duration: str) -> pd.DataFrame:
         """
@@ -290,15 +784,8 @@ class NILMTKAnalyzer:
         # Implementação simplificada - filtra eventos muito próximos
         min_timedelta = pd.Timedelta(min_duration)
         
-        filtered_events = []
-        last_event_time = None
-        
-        for _, event in events_df.iterrows():
-            if last_event_time is None or (event['timestamp'] - last_event_time) >= min_timedelta:
-                filtered_events.append(event)
-                last_event_time = event['timestamp']
-        
-        return pd.DataFrame(filtered_events)
+        ts_ns = events_df['timestamp'].to_numpy().astype('datetime64[ns]').view(np.int64)
+        return events_df.iloc[_keep_mask(ts_ns, min_timedelta.value)]
     
     def plot_power_consumption(self, period: str = 'all', 
                               figsize: Tuple[int, int] = (15, 8)) -> None:
@@ -314,19 +801,25 @@ class NILMTKAnalyzer:
         """
         if self.power_data is None:
             self.get_power_data()
-            
+        
+        _setup_palette()
         fig, axes = plt.subplots(2, 2, figsize=figsize)
         fig.suptitle('Análise de Consumo de Potência - ESP32 NILM', fontsize=16)
         
-        # 1. Série temporal completa
-        axes[0,0].plot(self.power_data.index, self.power_data['power'], 
+        # 1. Série temporal completa (decimada para desenho)
+        power_plot = _decimate(self.power_data['power'])
+        axes[0,0].plot(power_plot.index, power_plot.to_numpy(), 
                       linewidth=0.8, alpha=0.7)
         axes[0,0].set_title('Consumo de Potência - Série Temporal')
         axes[0,0].set_ylabel('Potência (W)')
         axes[0,0].grid(True, alpha=0.3)
         
-        # 2. Histograma de potência
-        axes[0,1].hist(self.power_data['power'], bins=50, alpha=0.7, edgecolor='black')
+        # 2. Histograma de potência (contagens calculadas uma vez pelo NumPy)
+        power = self._power_array()
+        valid = ~np.isnan(power)
+        hist_counts, edges = np.histogram(power[valid], bins=50)
+        axes[0,1].bar(edges[:-1], hist_counts, width=np.diff(edges), align='edge',
+                      alpha=0.7, edgecolor='black')
         axes[0,1].set_title('Distribuição de Potência')
         axes[0,1].set_xlabel('Potência (W)')
         axes[0,1].set_ylabel('Frequência')
@@ -334,8 +827,16 @@ class NILMTKAnalyzer:
         
         # 3. Padrão horário
         if len(self.power_data) > 24:
-            hourly_pattern = self.power_data.groupby(self.power_data.index.hour)['power'].mean()
-            axes[1,0].bar(hourly_pattern.index, hourly_pattern.values, alpha=0.7)
+            # Média por hora do dia com bincount (24 bins fixos), sem GroupBy
+            hours = self._hour_array()
+            has_hour = hours >= 0
+            valid &= has_hour
+            sums = np.bincount(hours[valid], weights=power[valid], minlength=24)
+            counts = np.bincount(hours[valid], minlength=24)
+            present = np.flatnonzero(np.bincount(hours[has_hour], minlength=24))
+            with np.errstate(invalid='ignore'):
+                hourly_pattern = sums[present] / counts[present]
+            axes[1,0].bar(present, hourly_pattern, alpha=0.7)
             axes[1,0].set_title('Padrão de Consumo por Hora')
             axes[1,0].set_xlabel('Hora do Dia')
             axes[1,0].set_ylabel('Potência Média (W)')
@@ -343,7 +844,8 @@ class NILMTKAnalyzer:
         
         # 4. Tensão vs Corrente
         if 'voltage' in self.power_data.columns and 'current' in self.power_data.columns:
-            axes[1,1].scatter(self.power_data['voltage'], self.power_data['current'], 
+            vi_plot = _decimate(self.power_data[['voltage', 'current']])
+            axes[1,1].scatter(vi_plot['voltage'].to_numpy(), vi_plot['current'].to_numpy(), 
                             alpha=0.5, s=1)
             axes[1,1].set_title('Tensão vs Corrente')
             axes[1,1].set_xlabel('Tensão (V)')
@@ -369,20 +871,24 @@ class NILMTKAnalyzer:
             print("Nenhum evento para plotar")
             return
             
+        _setup_palette()
         fig, ax = plt.subplots(figsize=(15, 6))
         
         # Plota série temporal
         ax.plot(self.power_data.index, self.power_data['power'], 
                linewidth=1, alpha=0.7, color='blue', label='Potência')
         
-        # Marca eventos
-        for _, event in events_df.iterrows():
-            color = 'green' if event['event_type'] == 'turn_on' else 'red'
-            marker = '^' if event['event_type'] == 'turn_on' else 'v'
-            
-            ax.scatter(event['timestamp'], event['power_after'], 
-                      color=color, s=100, marker=marker, 
-                      label=f"Liga/Desliga" if _ == 0 else "", zorder=5)
+        # Marca eventos: um scatter para cada tipo
+        timestamps = events_df['timestamp'].to_numpy()
+        power_after = events_df['power_after'].to_numpy()
+        turn_on = (events_df['event_type'] == 'turn_on').to_numpy()
+        
+        for mask, color, marker, label in ((turn_on, 'green', '^', 'Liga'),
+                                           (~turn_on, 'red', 'v', 'Desliga')):
+            if mask.any():
+                ax.scatter(timestamps[mask], power_after[mask], 
+                          color=color, s=100, marker=marker, 
+                          label=label, zorder=5)
         
         ax.set_title('Detecção de Eventos de Aparelhos')
         ax.set_xlabel('Tempo')
@@ -414,67 +920,75 @@ class NILMTKAnalyzer:
         stats = self.analyze_consumption_patterns()
         events = self.detect_appliance_events()
         
-        # Gera relatório
-        report = f"""
+        # Gera relatório em um buffer em memória, com as seções extraídas uma vez
+        cs = stats['consumption_stats']
+        tp = stats['temporal_patterns']
+        dq = stats['data_quality']
+        n_events = len(events)
+        
+        buf = io.StringIO()
+        buf.write(f"""
 # RELATÓRIO DE ANÁLISE NILM - ESP32
 Gerado em: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 ## 📊 ESTATÍSTICAS DE CONSUMO
 
 ### Consumo Geral:
-- Potência média: {stats['consumption_stats']['mean_power']:.2f} W
-- Potência máxima: {stats['consumption_stats']['max_power']:.2f} W
-- Potência mínima: {stats['consumption_stats']['min_power']:.2f} W
-- Desvio padrão: {stats['consumption_stats']['std_power']:.2f} W
-- Energia total: {stats['consumption_stats']['total_energy']:.2f} Wh
+- Potência média: {cs['mean_power']:.2f} W
+- Potência máxima: {cs['max_power']:.2f} W
+- Potência mínima: {cs['min_power']:.2f} W
+- Desvio padrão: {cs['std_power']:.2f} W
+- Energia total: {cs['total_energy']:.2f} Wh
 
 ### Padrões Temporais:
-- Hora de pico: {stats['temporal_patterns']['peak_hour']}:00
-- Hora de mínimo: {stats['temporal_patterns']['min_hour']}:00
-- Variação diária: {stats['temporal_patterns']['daily_variation']:.2f} W
+- Hora de pico: {tp['peak_hour']}:00
+- Hora de mínimo: {tp['min_hour']}:00
+- Variação diária: {tp['daily_variation']:.2f} W
 
 ## 🔍 EVENTOS DETECTADOS
 
-Total de eventos: {len(events)}
+Total de eventos: {n_events}
 
 ### Eventos por Tipo:
-"""
+""")
         
         if not events.empty:
             event_counts = events['event_type'].value_counts()
             for event_type, count in event_counts.items():
-                report += f"- {event_type}: {count}\n"
+                if count:
+                    buf.write(f"- {event_type}: {count}\n")
         else:
-            report += "- Nenhum evento detectado\n"
+            buf.write("- Nenhum evento detectado\n")
         
-        report += f"""
+        buf.write(f"""
 ## 📈 QUALIDADE DOS DADOS
 
-- Total de amostras: {stats['data_quality']['total_samples']:,}
-- Valores faltantes: {stats['data_quality']['missing_values']}
-- Valores zero: {stats['data_quality']['zero_values']}
-- Taxa de amostragem: {stats['data_quality']['sampling_rate']:.2f} Hz
+- Total de amostras: {dq['total_samples']:,}
+- Valores faltantes: {dq['missing_values']}
+- Valores zero: {dq['zero_values']}
+- Taxa de amostragem: {dq['sampling_rate']:.2f} Hz
 
 ## 📋 CONCLUSÕES
 
 1. Dataset coletado da ESP32 com {len(self.power_data)} amostras
-2. Consumo médio de {stats['consumption_stats']['mean_power']:.1f}W
-3. {len(events)} eventos de aparelhos detectados
+2. Consumo médio de {cs['mean_power']:.1f}W
+3. {n_events} eventos de aparelhos detectados
 4. Dados adequados para análise NILM avançada
 
 ---
 Análise gerada pelo sistema ESP32-NILMTK
-"""
+""")
         
-        # Salva relatório
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(report)
+        # Salva relatório (buffer de escrita grande: uma única chamada ao sistema)
+        with open(output_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            f.write(buf.getvalue())
             
         print(f"📄 Relatório salvo: {output_file}")
         return output_file
 
 def analyze_esp32_nilmtk_data(hdf5_file: str, 
-                             output_dir: str = ".") -> Dict:
+                             output_dir: str = ".",
+                             preload: bool = False) -> Dict:
     """
     Função utilitária para análise completa de dados ESP32-NILMTK.
     
@@ -484,6 +998,8 @@ def analyze_esp32_nilmtk_data(hdf5_file: str,
         Caminho do arquivo HDF5 NILMTK
     output_dir : str
         Diretório para salvar resultados
+    preload : bool
+        Mantém o HDF5 em memória no analisador retornado (recargas rápidas)
         
     Returns:
     --------
@@ -494,7 +1010,7 @@ def analyze_esp32_nilmtk_data(hdf5_file: str,
     print("-" * 50)
     
     # Cria analisador
-    analyzer = NILMTKAnalyzer(hdf5_file)
+    analyzer = NILMTKAnalyzer(hdf5_file, preload=preload)
     
     # Carrega dataset
     if not analyzer.load_dataset():
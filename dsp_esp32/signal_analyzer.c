@@ -15,6 +15,7 @@
 #define N_SAMPLES 512
 #define SAMPLE_FREQ_HZ 10000
 #define FILTER_FC 1000  // Frequência de corte do filtro passa-baixas (1kHz)
+#define BINARY_OUTPUT 0  // 1: envia os blocos como quadros binários em vez de texto
 
 // ADC
 adc_channel_t ADC_CHANNEL[1] = {ADC_CHANNEL_5};
@@ -111,52 +112,94 @@ static void calculate_fft(float *input, float *mag_output) {
     }
 }
 
+#if BINARY_OUTPUT
+// Canais do quadro binário (mesma ordem de CHANNELS no signal_analyzer.py)
+enum { CH_SIGNAL_ORIGINAL, CH_SIGNAL_FILTERED, CH_FFT_ORIGINAL, CH_FFT_FILTERED };
+
+static float frame_pairs[N_SAMPLES * 2];
+
+/**
+ * Envia um bloco como quadro binário: "SIG0", canal (uint32), número de
+ * pares (uint32) e os pares (x, y) em float32 little-endian, com x = i * x_num / x_den
+ * (mesmo cálculo da saída em texto).
+ * Requer o console com fim de linha LF (CONFIG_NEWLIB_STDOUT_LINE_ENDING_LF),
+ * senão bytes 0x0A dos floats são convertidos em "\r\n".
+ */
+static void send_frame(uint32_t channel, const float *y, uint32_t count, float x_num, float x_den) {
+    const uint32_t header[2] = {channel, count};
+    for (uint32_t i = 0; i < count; i++) {
+        frame_pairs[2 * i] = (float)i * x_num / x_den;
+        frame_pairs[2 * i + 1] = y[i];
+    }
+    fwrite("SIG0", 1, 4, stdout);
+    fwrite(header, sizeof(header), 1, stdout);
+    fwrite(frame_pairs, sizeof(float), 2 * count, stdout);
+    fflush(stdout);
+}
+#endif
+
 /**
  * Envia dados do sinal original
  */
 static void send_original_signal(void) {
+#if BINARY_OUTPUT
+    send_frame(CH_SIGNAL_ORIGINAL, adc_buffer, N_SAMPLES, 1.0f, SAMPLE_FREQ_HZ);
+#else
     printf("---SIGNAL_ORIGINAL_START---\n");
     for (int i = 0; i < N_SAMPLES; i++) {
         float time = (float)i / SAMPLE_FREQ_HZ;
         printf("%.6f,%.6f\n", time, adc_buffer[i]);
     }
     printf("---SIGNAL_ORIGINAL_END---\n");
+#endif
 }
 
 /**
  * Envia dados do sinal filtrado
  */
 static void send_filtered_signal(void) {
+#if BINARY_OUTPUT
+    send_frame(CH_SIGNAL_FILTERED, filtered_buffer, N_SAMPLES, 1.0f, SAMPLE_FREQ_HZ);
+#else
     printf("---SIGNAL_FILTERED_START---\n");
     for (int i = 0; i < N_SAMPLES; i++) {
         float time = (float)i / SAMPLE_FREQ_HZ;
         printf("%.6f,%.6f\n", time, filtered_buffer[i]);
     }
     printf("---SIGNAL_FILTERED_END---\n");
+#endif
 }
 
 /**
  * Envia FFT do sinal original
  */
 static void send_fft_original(void) {
+#if BINARY_OUTPUT
+    send_frame(CH_FFT_ORIGINAL, mag_db_original, N_SAMPLES / 2, SAMPLE_FREQ_HZ, N_SAMPLES);
+#else
     printf("---FFT_ORIGINAL_START---\n");
     for (int i = 0; i < N_SAMPLES / 2; i++) {
         float freq = (float)i * SAMPLE_FREQ_HZ / N_SAMPLES;
         printf("%.1f,%.6f\n", freq, mag_db_original[i]);
     }
     printf("---FFT_ORIGINAL_END---\n");
+#endif
 }
 
 /**
  * Envia FFT do sinal filtrado
  */
 static void send_fft_filtered(void) {
+#if BINARY_OUTPUT
+    send_frame(CH_FFT_FILTERED, mag_db_filtered, N_SAMPLES / 2, SAMPLE_FREQ_HZ, N_SAMPLES);
+#else
     printf("---FFT_FILTERED_START---\n");
     for (int i = 0; i < N_SAMPLES / 2; i++) {
         float freq = (float)i * SAMPLE_FREQ_HZ / N_SAMPLES;
         printf("%.1f,%.6f\n", freq, mag_db_filtered[i]);
     }
     printf("---FFT_FILTERED_END---\n");
+#endif
 }
 
 /**
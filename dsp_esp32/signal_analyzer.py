@@ -1,34 +1,105 @@
 import sys
+import io
+import functools
+import hashlib
+import re
+import struct
 import serial
 import numpy as np
 import pandas as pd
 import pyqtgraph as pg
 from PyQt5 import QtWidgets, QtCore
 import os
+import queue
+import shutil
+import threading
 from datetime import datetime
 import time
 
+try:
+    import OpenGL  # noqa: F401 - necessário para a renderização OpenGL do pyqtgraph
+    OPENGL_AVAILABLE = True
+except ImportError:  # PyOpenGL é opcional - sem ele o Qt desenha na CPU
+    OPENGL_AVAILABLE = False
+
 # Configurações da porta serial
 SERIAL_PORT = '/dev/ttyACM0'  # Ajuste conforme necessário
 BAUD_RATE = 115200
 
+# Intervalo entre leituras da serial (ms); cada leitura drena todo o buffer.
+# Se ao fim da leitura restarem mais de READ_BACKLOG_BYTES, lê de novo sem esperar
+READ_INTERVAL_MS = 20
+READ_BACKLOG_BYTES = 4096
+
 # Arquivo CSV para salvar dados
 CSV_FILENAME = 'signal_analysis_data.csv'
 
-# Eixo X logarítmico para FFT
-class LogAxisItem(pg.AxisItem):
-    def tickStrings(self, values, scale, spacing):
-        return [f"{10**v:.0f}" if v > 0 else "1" for v in values]
+# Gravação em lote: até CSV_BATCH_PACKETS pacotes ou CSV_BATCH_WINDOW segundos
+CSV_BATCH_PACKETS = 16
+CSV_BATCH_WINDOW = 0.5
+
+# O arquivo fica aberto com buffer de CSV_BUFFER_SIZE bytes e é descarregado
+# no disco a cada CSV_FLUSH_PACKETS pacotes (e ao exportar/fechar)
+CSV_BUFFER_SIZE = 1 << 16
+CSV_FLUSH_PACKETS = 64
+
+# Canais enviados em cada pacote, na ordem em que são salvos no CSV
+CHANNELS = ('signal_original', 'signal_filtered', 'fft_original', 'fft_filtered')
+
+# Tipo das amostras em toda a cadeia (buffers, gráficos e CSV). float32
+# representa com folga o ADC de 12 bits do ESP32 e ocupa metade da memória
+DTYPE = np.float32
+
+# Capacidade inicial (amostras) de cada buffer; dobra quando necessário
+BUFFER_CAPACITY = 1024
+
+# Limite de amostras por canal: acima dele as mais antigas são descartadas
+# (ex.: marcador de fim perdido e dados chegando sem parar)
+MAX_CHANNEL_SAMPLES = 1 << 16
+
+# Linha de marcador enviada pelo ESP32 (ex.: ---SIGNAL_ORIGINAL_START---)
+MARKER_RE = re.compile(rb'^[ \t]*---([A-Z_]+)---[ \t\r]*$', re.MULTILINE)
+
+# Quadro binário (firmware com BINARY_OUTPUT): magic, canal (índice em
+# CHANNELS), número de pares e os pares (x, y) em float32 little-endian
+FRAME_MAGIC = b'SIG0'
+FRAME_HEADER = struct.Struct('<4sII')
+FRAME_MAX_PAIRS = MAX_CHANNEL_SAMPLES
+
+def _format_column(values):
+    """Formata floats com a menor representação exata do dtype (como o pandas.to_csv), NaN como campo vazio"""
+    text = values.astype(str)
+    text[np.isnan(values)] = ''
+    return text.tolist()
+
+def count_csv_records(filename, block_size=1 << 20):
+    """Conta os registros do CSV (linhas menos o cabeçalho) lendo em blocos"""
+    lines = 0
+    with open(filename, 'rb') as f:
+        while block := f.read(block_size):
+            lines += block.count(b'\n')
+    return max(lines - 1, 0)
 
 class SignalAnalyzer(QtWidgets.QMainWindow):
+    # Taxa máxima de redesenho dos gráficos (Hz), independente da taxa de pacotes
+    maxRedrawRate = 10
+    
     def __init__(self):
         super().__init__()
         
         self.setWindowTitle("Analisador de Sinais - Original vs Filtrado")
         self.resize(1400, 800)
         
-        # Inicializar arquivo CSV
+        # Inicializar arquivo CSV e a thread que grava os pacotes
         self.init_csv_file()
+        self._csv_fh = open(CSV_FILENAME, 'ab', buffering=CSV_BUFFER_SIZE)
+        self._unflushed_packets = 0
+        self._csv_queue = queue.Queue()
+        # Campos "i," da coluna index já formatados, reaproveitados entre pacotes
+        # (usado só pela thread de gravação)
+        self._index_fields = []
+        self._csv_thread = threading.Thread(target=self._csv_writer, daemon=True)
+        self._csv_thread.start()
         
         # Layout principal
         central_widget = QtWidgets.QWidget()
@@ -59,16 +130,16 @@ class SignalAnalyzer(QtWidgets.QMainWindow):
         self.curve_signal_filt = self.plot_signal_filt.plot(pen=pg.mkPen('c', width=2))
         
         # Gráfico 3: FFT Original
-        log_axis1 = LogAxisItem(orientation='bottom')
-        self.plot_fft_orig = pg.PlotWidget(title="FFT do Sinal Original", axisItems={'bottom': log_axis1})
+        self.plot_fft_orig = pg.PlotWidget(title="FFT do Sinal Original")
+        self.plot_fft_orig.setLogMode(x=True)  # Eixo X logarítmico
         self.plot_fft_orig.setLabel('bottom', 'Frequência (Hz)')
         self.plot_fft_orig.setLabel('left', 'Magnitude (dB)')
         self.plot_fft_orig.showGrid(x=True, y=True)
         self.curve_fft_orig = self.plot_fft_orig.plot(pen=pg.mkPen('orange', width=2))
         
         # Gráfico 4: FFT Filtrado
-        log_axis2 = LogAxisItem(orientation='bottom')
-        self.plot_fft_filt = pg.PlotWidget(title="FFT do Sinal Filtrado", axisItems={'bottom': log_axis2})
+        self.plot_fft_filt = pg.PlotWidget(title="FFT do Sinal Filtrado")
+        self.plot_fft_filt.setLogMode(x=True)  # Eixo X logarítmico
         self.plot_fft_filt.setLabel('bottom', 'Frequência (Hz)')
         self.plot_fft_filt.setLabel('left', 'Magnitude (dB)')
         self.plot_fft_filt.showGrid(x=True, y=True)
@@ -107,22 +178,56 @@ class SignalAnalyzer(QtWidgets.QMainWindow):
             print(f"[ERRO] Não foi possível abrir {SERIAL_PORT}: {e}")
             sys.exit(1)
         
-        # Variáveis para armazenar dados
-        self.current_data = {
-            'signal_original': {'time': [], 'amplitude': []},
-            'signal_filtered': {'time': [], 'amplitude': []},
-            'fft_original': {'frequency': [], 'magnitude': []},
-            'fft_filtered': {'frequency': [], 'magnitude': []}
-        }
+        # Buffers por canal (linha 0: tempo/frequência, linha 1: amplitude/magnitude)
+        # e número de amostras válidas no pacote atual
+        self.buffers = {key: np.empty((2, BUFFER_CAPACITY), dtype=DTYPE) for key in CHANNELS}
+        self.counts = {key: 0 for key in CHANNELS}
+        
+        # Bytes recebidos que ainda não formam uma linha completa
+        self._rxbuf = bytearray()
         
         # Estado da leitura
         self.reading_state = None
         self.packet_counter = 0
         
-        # Timer para leitura serial
+        # Marcadores do protocolo em texto -> tratador (um lookup por marcador)
+        self._markers = {b'DATA_COMPLETE': self._packet_complete}
+        for key in CHANNELS:
+            name = key.upper().encode()
+            self._markers[name + b'_START'] = functools.partial(self._start_channel, key)
+            self._markers[name + b'_END'] = self._end_channel
+        
+        # Timer para leitura serial (disparo único, reagendado por read_serial)
         self.timer = QtCore.QTimer()
+        self.timer.setSingleShot(True)
         self.timer.timeout.connect(self.read_serial)
-        self.timer.start(10)  # 10ms
+        self.timer.start(READ_INTERVAL_MS)
+        
+        # Pacotes completos ainda não desenhados: canal -> cópia (x, y) dos dados
+        self._dirty = {}
+        # Hash dos últimos dados enviados a cada curva (pula setData repetido)
+        self._last_hash = dict.fromkeys(CHANNELS)
+        self._curves = {
+            'signal_original': self.curve_signal_orig,
+            'signal_filtered': self.curve_signal_filt,
+            'fft_original': self.curve_fft_orig,
+            'fft_filtered': self.curve_fft_filt
+        }
+        for curve in self._curves.values():
+            # Desenha no máximo ~1 ponto por pixel (preservando picos), só a
+            # parte visível, e sem o np.isfinite por setData
+            curve.setDownsampling(auto=True, method='peak')
+            curve.setClipToView(True)
+            curve.setSkipFiniteCheck(True)
+        self._plots = [self.plot_signal_orig, self.plot_signal_filt,
+                       self.plot_fft_orig, self.plot_fft_filt]
+        
+        # Redesenho limitado a maxRedrawRate: imediato se o último foi há mais
+        # de 1/maxRedrawRate s, senão um único disparo ao fim da janela
+        self._last_draw_t = 0.0
+        self.redraw_timer = QtCore.QTimer()
+        self.redraw_timer.setSingleShot(True)
+        self.redraw_timer.timeout.connect(self.update_plots)
         
     def init_csv_file(self):
         """Inicializa arquivo CSV com cabeçalhos se não existir"""
@@ -138,105 +243,201 @@ class SignalAnalyzer(QtWidgets.QMainWindow):
             print(f"[INFO] Usando arquivo CSV existente: {CSV_FILENAME}")
     
     def read_serial(self):
-        """Lê dados da porta serial"""
-        while self.ser.in_waiting:
-            try:
-                line = self.ser.readline().decode('utf-8', errors='ignore').strip()
-                
-                # Processa marcadores de início/fim
-                if line == "---SIGNAL_ORIGINAL_START---":
-                    self.reading_state = 'signal_original'
-                    self.current_data['signal_original'] = {'time': [], 'amplitude': []}
-                    continue
-                elif line == "---SIGNAL_ORIGINAL_END---":
-                    self.reading_state = None
-                    continue
-                elif line == "---SIGNAL_FILTERED_START---":
-                    self.reading_state = 'signal_filtered'
-                    self.current_data['signal_filtered'] = {'time': [], 'amplitude': []}
-                    continue
-                elif line == "---SIGNAL_FILTERED_END---":
-                    self.reading_state = None
-                    continue
-                elif line == "---FFT_ORIGINAL_START---":
-                    self.reading_state = 'fft_original'
-                    self.current_data['fft_original'] = {'frequency': [], 'magnitude': []}
-                    continue
-                elif line == "---FFT_ORIGINAL_END---":
-                    self.reading_state = None
-                    continue
-                elif line == "---FFT_FILTERED_START---":
-                    self.reading_state = 'fft_filtered'
-                    self.current_data['fft_filtered'] = {'frequency': [], 'magnitude': []}
-                    continue
-                elif line == "---FFT_FILTERED_END---":
-                    self.reading_state = None
-                    continue
-                elif line == "---DATA_COMPLETE---":
-                    self.packet_counter += 1
-                    self.update_plots()
-                    self.save_to_csv()
-                    self.status_label.setText(f"Status: Pacote #{self.packet_counter} recebido")
-                    continue
-                
-                # Processa dados baseado no estado atual
-                if self.reading_state and line:
-                    parts = line.split(',')
-                    if len(parts) == 2:
-                        try:
-                            x_val = float(parts[0])
-                            y_val = float(parts[1])
-                            
-                            if self.reading_state == 'signal_original':
-                                self.current_data['signal_original']['time'].append(x_val)
-                                self.current_data['signal_original']['amplitude'].append(y_val)
-                            elif self.reading_state == 'signal_filtered':
-                                self.current_data['signal_filtered']['time'].append(x_val)
-                                self.current_data['signal_filtered']['amplitude'].append(y_val)
-                            elif self.reading_state == 'fft_original':
-                                if x_val > 0:  # Evita log(0)
-                                    self.current_data['fft_original']['frequency'].append(np.log10(x_val))
-                                    self.current_data['fft_original']['magnitude'].append(y_val)
-                            elif self.reading_state == 'fft_filtered':
-                                if x_val > 0:  # Evita log(0)
-                                    self.current_data['fft_filtered']['frequency'].append(np.log10(x_val))
-                                    self.current_data['fft_filtered']['magnitude'].append(y_val)
-                        except ValueError:
-                            print(f"[WARNING] Valor inválido ignorado: {line}")
-                
-            except Exception as e:
-                print(f"[ERROR] Erro ao processar linha: {e}")
+        """Lê a porta serial e agenda a próxima leitura conforme o volume pendente"""
+        backlog = self._drain_serial()
+        self.timer.start(0 if backlog > READ_BACKLOG_BYTES else READ_INTERVAL_MS)
     
-    def update_plots(self):
-        """Atualiza todos os gráficos com os dados atuais"""
+    def _drain_serial(self):
+        """
+        Lê em bloco os bytes disponíveis na porta serial e processa os dados completos.
+        
+        Retorna o número de bytes que chegaram durante o processamento.
+        """
         try:
-            # Atualizar sinal original
-            if self.current_data['signal_original']['time']:
-                self.curve_signal_orig.setData(
-                    self.current_data['signal_original']['time'],
-                    self.current_data['signal_original']['amplitude']
-                )
-            
-            # Atualizar sinal filtrado
-            if self.current_data['signal_filtered']['time']:
-                self.curve_signal_filt.setData(
-                    self.current_data['signal_filtered']['time'],
-                    self.current_data['signal_filtered']['amplitude']
-                )
+            n = self.ser.in_waiting
+            if not n:
+                return 0
+            self._rxbuf += self.ser.read(n)
             
-            # Atualizar FFT original
-            if self.current_data['fft_original']['frequency']:
-                self.curve_fft_orig.setData(
-                    self.current_data['fft_original']['frequency'],
-                    self.current_data['fft_original']['magnitude']
-                )
+            # Texto e quadros binários podem se alternar: processa em ordem
+            # e deixa no buffer o que ainda estiver incompleto
+            buf = self._rxbuf
+            pos = 0
+            while True:
+                frame = buf.find(FRAME_MAGIC, pos)
+                text_end = len(buf) if frame < 0 else frame
+                # Só processa até a última quebra de linha antes do quadro
+                end = buf.rfind(b'\n', pos, text_end) + 1
+                if frame >= 0:
+                    end = text_end
+                if end > pos:
+                    self._parse_text(bytes(buf[pos:end]))
+                    pos = end
+                if frame < 0:
+                    break
+                end = self._parse_frame(buf, frame)
+                if end is None:
+                    break
+                pos = end
+            del self._rxbuf[:pos]
+            return self.ser.in_waiting
             
-            # Atualizar FFT filtrado
-            if self.current_data['fft_filtered']['frequency']:
-                self.curve_fft_filt.setData(
-                    self.current_data['fft_filtered']['frequency'],
-                    self.current_data['fft_filtered']['magnitude']
-                )
+        except Exception as e:
+            print(f"[ERROR] Erro ao processar linha: {e}")
+            return 0
+    
+    def _parse_text(self, data):
+        """Processa linhas de texto: os marcadores dividem os dados em regiões numéricas homogêneas"""
+        pos = 0
+        for match in MARKER_RE.finditer(data):
+            self._parse_block(data[pos:match.start()])
+            handler = self._markers.get(match.group(1))
+            if handler:
+                handler()
+            pos = match.end()
+        self._parse_block(data[pos:])
+    
+    def _parse_frame(self, buf, start):
+        """
+        Processa o quadro binário que começa em buf[start].
+        
+        Retorna a posição seguinte ao quadro, ou None se ele ainda não
+        chegou por completo.
+        """
+        if len(buf) - start < FRAME_HEADER.size:
+            return None
+        _, channel, count = FRAME_HEADER.unpack_from(buf, start)
+        if channel >= len(CHANNELS) or count > FRAME_MAX_PAIRS:
+            print(f"[WARNING] Cabeçalho de quadro inválido ignorado: canal {channel}, {count} pares")
+            return start + len(FRAME_MAGIC)
+        end = start + FRAME_HEADER.size + 8 * count
+        if len(buf) < end:
+            return None
+        
+        # Cópia (astype): o bytearray é redimensionado depois
+        values = np.frombuffer(buf, dtype='<f4', count=2 * count,
+                               offset=start + FRAME_HEADER.size).reshape(-1, 2).astype(DTYPE)
+        key = CHANNELS[channel]
+        self.counts[key] = 0
+        self._append(key, values)
+        return end
+    
+    def _start_channel(self, key):
+        """Marcador de início: os próximos valores pertencem ao canal key"""
+        self.reading_state = key
+        self.counts[key] = 0
+    
+    def _end_channel(self):
+        """Marcador de fim de canal"""
+        self.reading_state = None
+    
+    def _packet_complete(self):
+        """Marcador de pacote completo"""
+        self.packet_counter += 1
+        self.mark_dirty()
+        self.schedule_redraw()
+        self.save_to_csv()
+        self.status_label.setText(f"Status: Pacote #{self.packet_counter} recebido")
+    
+    def _parse_block(self, block):
+        """Converte um bloco de linhas 'x,y' de uma só vez e anexa ao estado atual"""
+        if not self.reading_state or not block.strip():
+            return
+        try:
+            values = np.loadtxt(io.BytesIO(block), delimiter=',', comments=None,
+                                ndmin=2, dtype=DTYPE)
+            if values.shape[1] != 2:
+                raise ValueError(f"{values.shape[1]} colunas")
+        except ValueError:
+            # Bloco com linhas inválidas: processa linha a linha
+            values = self._parse_lines(block)
+        
+        self._append(self.reading_state, values)
+    
+    def _append(self, key, values):
+        """
+        Copia um bloco (N, 2) para o buffer do canal, ampliando-o se necessário.
+        
+        Como um deque com maxlen, mantém só as MAX_CHANNEL_SAMPLES amostras
+        mais recentes.
+        """
+        if key.startswith('fft'):
+            values = values[values[:, 0] > 0]  # Evita log(0) no eixo logarítmico
+        values = values[-MAX_CHANNEL_SAMPLES:]
+        start = self.counts[key]
+        end = start + len(values)
+        buf = self.buffers[key]
+        if end > MAX_CHANNEL_SAMPLES:
+            # Descarta as amostras mais antigas
+            drop = end - MAX_CHANNEL_SAMPLES
+            buf[:, :start - drop] = buf[:, drop:start]
+            start -= drop
+            end = MAX_CHANNEL_SAMPLES
+        if end > buf.shape[1]:
+            grown = np.empty((2, min(max(end, 2 * buf.shape[1]), MAX_CHANNEL_SAMPLES)), dtype=DTYPE)
+            grown[:, :start] = buf[:, :start]
+            self.buffers[key] = buf = grown
+        buf[:, start:end] = values.T
+        self.counts[key] = end
+    
+    def _channel(self, key):
+        """Retorna views (x, y) das amostras válidas do canal"""
+        return self.buffers[key][:, :self.counts[key]]
+    
+    def _parse_lines(self, block):
+        """Converte linha a linha, ignorando as linhas inválidas"""
+        rows = []
+        for line in block.decode('utf-8', errors='ignore').splitlines():
+            line = line.strip()
+            parts = line.split(',')
+            if len(parts) == 2:
+                try:
+                    rows.append((float(parts[0]), float(parts[1])))
+                except ValueError:
+                    print(f"[WARNING] Valor inválido ignorado: {line}")
+        return np.array(rows, dtype=DTYPE).reshape(-1, 2)
+    
+    def mark_dirty(self):
+        """Guarda os dados do pacote completo para o próximo redesenho"""
+        # Cópia: o setData mantém referência aos arrays e os buffers são
+        # sobrescritos pelo próximo pacote
+        for key in CHANNELS:
+            if not self.counts[key]:
+                continue
+            data = self._channel(key)
+            # Dados idênticos aos já desenhados (ex.: canal não reenviado
+            # ou retransmissão) não disparam um novo setData
+            digest = hashlib.blake2b(np.ascontiguousarray(data), digest_size=16).digest()
+            if digest != self._last_hash[key]:
+                self._last_hash[key] = digest
+                self._dirty[key] = data.copy()
+    
+    def schedule_redraw(self):
+        """Redesenha agora ou agenda o redesenho para o fim da janela de 1/maxRedrawRate s"""
+        if self.redraw_timer.isActive():
+            return  # Já agendado: os pacotes novos entram no mesmo redesenho
+        wait = self._last_draw_t + 1.0 / self.maxRedrawRate - time.monotonic()
+        if wait <= 0:
+            self.update_plots()
+        else:
+            self.redraw_timer.start(int(wait * 1000) + 1)
+    
+    def update_plots(self):
+        """Atualiza os gráficos dos canais com dados novos"""
+        if not self._dirty:
+            return
+        try:
+            # Bloqueia repinturas intermediárias durante os setData
+            for plot in self._plots:
+                plot.setUpdatesEnabled(False)
+            try:
+                for key, (x, y) in self._dirty.items():
+                    self._curves[key].setData(x, y)
+            finally:
+                for plot in self._plots:
+                    plot.setUpdatesEnabled(True)
+            self._dirty.clear()
+            self._last_draw_t = time.monotonic()
                 
             print(f"[INFO] Gráficos atualizados - Pacote #{self.packet_counter}")
             
@@ -244,52 +445,59 @@ class SignalAnalyzer(QtWidgets.QMainWindow):
             print(f"[ERROR] Erro ao atualizar gráficos: {e}")
     
     def save_to_csv(self):
-        """Salva dados atuais no arquivo CSV"""
-        try:
-            timestamp = datetime.now().isoformat()
-            rows = []
-            
-            # Salvar sinal original
-            for i, (t, amp) in enumerate(zip(
-                self.current_data['signal_original']['time'],
-                self.current_data['signal_original']['amplitude']
-            )):
-                rows.append([timestamp, self.packet_counter, 'signal_original', i, t, amp])
-            
-            # Salvar sinal filtrado
-            for i, (t, amp) in enumerate(zip(
-                self.current_data['signal_filtered']['time'],
-                self.current_data['signal_filtered']['amplitude']
-            )):
-                rows.append([timestamp, self.packet_counter, 'signal_filtered', i, t, amp])
-            
-            # Salvar FFT original (converter log de volta para Hz)
-            for i, (log_f, mag) in enumerate(zip(
-                self.current_data['fft_original']['frequency'],
-                self.current_data['fft_original']['magnitude']
-            )):
-                freq_hz = 10 ** log_f
-                rows.append([timestamp, self.packet_counter, 'fft_original', i, freq_hz, mag])
-            
-            # Salvar FFT filtrado (converter log de volta para Hz)
-            for i, (log_f, mag) in enumerate(zip(
-                self.current_data['fft_filtered']['frequency'],
-                self.current_data['fft_filtered']['magnitude']
-            )):
-                freq_hz = 10 ** log_f
-                rows.append([timestamp, self.packet_counter, 'fft_filtered', i, freq_hz, mag])
+        """Enfileira os dados atuais para gravação no arquivo CSV"""
+        timestamp = datetime.now().isoformat()
+        channels = {key: self._channel(key).copy() for key in CHANNELS}
+        self._csv_queue.put((timestamp, self.packet_counter, channels))
+    
+    def _csv_writer(self):
+        """Thread que grava no CSV os pacotes enfileirados, em lotes"""
+        while True:
+            batch = [self._csv_queue.get()]
+            deadline = time.monotonic() + CSV_BATCH_WINDOW
+            while batch[-1] is not None and len(batch) < CSV_BATCH_PACKETS:
+                try:
+                    batch.append(self._csv_queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
             
-            # Adicionar ao CSV
-            if rows:
-                df = pd.DataFrame(rows, columns=[
-                    'timestamp', 'packet_id', 'data_type', 'index', 
-                    'time_or_freq', 'amplitude_or_magnitude'
-                ])
-                df.to_csv(CSV_FILENAME, mode='a', header=False, index=False)
-                print(f"[INFO] {len(rows)} pontos salvos no CSV")
+            try:
+                self._write_packets([item for item in batch if item is not None])
+            except Exception as e:
+                print(f"[ERROR] Erro ao salvar CSV: {e}")
+            finally:
+                for _ in batch:
+                    self._csv_queue.task_done()
             
-        except Exception as e:
-            print(f"[ERROR] Erro ao salvar CSV: {e}")
+            # None sinaliza o fechamento da aplicação
+            if batch[-1] is None:
+                return
+    
+    def _write_packets(self, packets):
+        """Grava um lote de pacotes (timestamp, packet_id, canais) no CSV"""
+        lines = []
+        for timestamp, packet_id, channels in packets:
+            for key in CHANNELS:
+                x, y = channels[key]
+                prefix = f"{timestamp},{packet_id},{key},"
+                lines.extend([prefix + i + a + ',' + b + '\n' for i, a, b in
+                              zip(self._index_column(len(x)), _format_column(x), _format_column(y))])
+        
+        # Adicionar ao CSV
+        if lines:
+            self._csv_fh.write(''.join(lines).encode())
+            self._unflushed_packets += len(packets)
+            if self._unflushed_packets >= CSV_FLUSH_PACKETS:
+                self._csv_fh.flush()
+                self._unflushed_packets = 0
+            print(f"[INFO] {len(lines)} pontos salvos no CSV")
+    
+    def _index_column(self, n):
+        """Retorna os n primeiros campos da coluna index, ampliando o cache se necessário"""
+        fields = self._index_fields
+        if len(fields) < n:
+            fields.extend(f"{i}," for i in range(len(fields), n))
+        return fields[:n]
     
     def save_current_data(self):
         """Salva manualmente os dados atuais"""
@@ -298,6 +506,8 @@ class SignalAnalyzer(QtWidgets.QMainWindow):
     
     def clear_plots(self):
         """Limpa todos os gráficos"""
+        self._dirty.clear()
+        self._last_hash = dict.fromkeys(CHANNELS)
         self.curve_signal_orig.clear()
         self.curve_signal_filt.clear()
         self.curve_fft_orig.clear()
@@ -310,13 +520,15 @@ class SignalAnalyzer(QtWidgets.QMainWindow):
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             new_filename = f"signal_export_{timestamp}.csv"
             
-            # Copia arquivo atual
-            df = pd.read_csv(CSV_FILENAME)
-            df.to_csv(new_filename, index=False)
+            # Aguarda a gravação dos pacotes pendentes e copia o arquivo atual
+            # (cópia no kernel, sem passar os dados pelo pandas)
+            self._csv_queue.join()
+            self._csv_fh.flush()
+            shutil.copyfile(CSV_FILENAME, new_filename)
             
             QtWidgets.QMessageBox.information(
                 self, "Exportar", f"Dados exportados para {new_filename}\n"
-                f"Total de registros: {len(df)}"
+                f"Total de registros: {count_csv_records(new_filename)}"
             )
             print(f"[INFO] Dados exportados para {new_filename}")
             
@@ -325,11 +537,20 @@ class SignalAnalyzer(QtWidgets.QMainWindow):
     
     def closeEvent(self, event):
         """Fechar aplicação"""
+        self.timer.stop()
+        # Grava os pacotes pendentes antes de fechar o arquivo
+        self._csv_queue.put(None)
+        self._csv_thread.join()
+        self._csv_fh.close()
         if hasattr(self, 'ser') and self.ser.is_open:
             self.ser.close()
         event.accept()
 
 def main():
+    # Sem antialiasing e, se disponível, com OpenGL: reduz o custo de pintura
+    pg.setConfigOptions(antialias=False, useOpenGL=OPENGL_AVAILABLE,
+                        enableExperimental=OPENGL_AVAILABLE)
+    
     app = QtWidgets.QApplication(sys.argv)
     
     # Configurar estilo